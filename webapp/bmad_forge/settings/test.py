@@ -29,6 +29,16 @@ PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.MD5PasswordHasher',
 ]
 
+# Templates - Compile each template once for the whole run, whatever DEBUG is
+for template in TEMPLATES:
+    template['APP_DIRS'] = False
+    template['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 # Caching - Dummy cache (no caching) for predictable tests
 CACHES = {
     'default': {
@@ -36,6 +46,9 @@ CACHES = {
     }
 }
 
+# Sessions - Keep session data in a signed cookie instead of the database
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+
 # Email - Store emails in memory for testing
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
 
@@ -68,7 +81,8 @@ LOGGING = {
 }
 
 # Disable migrations for faster tests (optional)
-# Uncomment if you want to use --nomigrations flag behavior by default
+# pytest already passes --nomigrations (see pytest.ini); uncomment to get the
+# same behavior from manage.py test
 # class DisableMigrations:
 #     def __contains__(self, item):
 #         return True
@@ -12,6 +12,15 @@ class DynamicPromptForm(forms.Form):
     Dynamic form that generates fields based on template variables.
     """
     
+    # Variables whose names contain one of these get a textarea (long content)
+    LONG_VARIABLE_KEYWORDS = ('description', 'context', 'details', 'requirements', 'content', 'instructions')
+    
+    @staticmethod
+    def field_name_for(var):
+        """Return the form field name for a template variable."""
+        # Create field name without special characters for form field
+        return var.lower().replace(' ', '_')
+    
     def __init__(self, *args, template=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.template = template
@@ -19,12 +28,10 @@ class DynamicPromptForm(forms.Form):
         if template:
             variables = template.get_variables_list()
             for var in variables:
-                # Create field name without special characters for form field
-                field_name = var.lower().replace(' ', '_')
+                field_name = self.field_name_for(var)
                 
                 # Determine if this should be a textarea (long content)
-                long_vars = ['description', 'context', 'details', 'requirements', 'content', 'instructions']
-                is_long = any(long_var in var.lower() for long_var in long_vars)
+                is_long = any(keyword in field_name for keyword in self.LONG_VARIABLE_KEYWORDS)
                 
                 if is_long:
                     field_class = forms.CharField(widget=forms.Textarea(attrs={
@@ -52,8 +59,7 @@ class DynamicPromptForm(forms.Form):
         variables = self.template.get_variables_list()
         
         for var in variables:
-            field_name = var.lower().replace(' ', '_')
-            output_data[var] = self.cleaned_data.get(field_name, '')
+            output_data[var] = self.cleaned_data.get(self.field_name_for(var), '')
         
         return self.template.generate_prompt(**output_data)
 
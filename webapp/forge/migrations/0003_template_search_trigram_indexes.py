@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+# Django renders ``field__icontains`` on PostgreSQL as ``UPPER("col"::text) LIKE UPPER(%s)``;
+# trigram GIN indexes over the same expression let those searches use an index scan.
+SEARCH_COLUMNS = ['title', 'description', 'content']
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Create pg_trgm search indexes (PostgreSQL only)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS forge_template_{column}_trgm '
+            f'ON forge_template USING gin (UPPER({column}::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    """Drop pg_trgm search indexes (PostgreSQL only)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS forge_template_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forge', '0002_add_agent_roles_field'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-14 05:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forge', '0003_template_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generatedprompt',
+            name='validation_report',
+            field=models.JSONField(blank=True, default=dict, help_text='BMAD validation summary computed when the prompt was generated'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-14 05:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forge', '0004_generatedprompt_validation_report'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='template',
+            index=models.Index(fields=['is_active', 'agent_role'], name='forge_templ_is_acti_32da7a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='template',
+            index=models.Index(fields=['is_active', 'workflow_phase'], name='forge_templ_is_acti_4d9cb2_idx'),
+        ),
+    ]
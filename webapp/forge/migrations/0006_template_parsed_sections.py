@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-14 05:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forge', '0005_template_active_role_phase_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='template',
+            name='parsed_sections',
+            field=models.JSONField(blank=True, default=list, help_text='Document sections parsed from the content, cached for the wizard'),
+        ),
+    ]
@@ -7,6 +7,7 @@ from django.conf import settings
 from django.utils import timezone
 import json
 import re
+import sys
 
 
 class TemplateManager(models.Manager):
@@ -35,6 +36,28 @@ class TemplateManager(models.Manager):
         ]
         return queryset.filter(id__in=matching_ids)
     
+    def search(self, queryset, term):
+        """
+        Filter templates whose title, description or content contains a search term.
+        
+        Case-insensitive substring match on every backend. On PostgreSQL these
+        lookups are served by the pg_trgm indexes created in migration 0003.
+        
+        Args:
+            queryset: The queryset to filter
+            term: The search term
+            
+        Returns:
+            Filtered queryset containing templates matching the search term
+        """
+        if not term:
+            return queryset
+        return queryset.filter(
+            models.Q(title__icontains=term) |
+            models.Q(description__icontains=term) |
+            models.Q(content__icontains=term)
+        )
+    
     def filter_by_workflow(self, queryset, workflow_phase):
         """
         Filter templates by workflow phase.
@@ -51,6 +74,57 @@ class TemplateManager(models.Manager):
         return queryset.filter(workflow_phase=workflow_phase)
 
 
+# Human-readable labels for agent role identifiers, resolved from settings once
+AGENT_ROLE_LABELS = dict(settings.BMAD_AGENT_ROLES)
+
+# {{VARIABLE_NAME}} and [VARIABLE_NAME] placeholders, compiled once at import
+VARIABLE_PATTERN = re.compile(r'\{\{(\w+)\}\}|\[(\w+)\]')
+
+
+class GeneratedPromptManager(models.Manager):
+    """Custom manager for GeneratedPrompt model with form-based creation helpers."""
+    
+    def build_from_form(self, form):
+        """
+        Build an unsaved GeneratedPrompt from a validated DynamicPromptForm.
+        
+        Args:
+            form: A bound DynamicPromptForm whose is_valid() returned True
+            
+        Returns:
+            Tuple of (unsaved GeneratedPrompt, BMADValidationReport)
+        """
+        # Imported here to avoid a circular import (services import the models)
+        from .services.bmad_validator import BMADValidator
+        
+        final_output = form.generate_output()
+        validation_report = BMADValidator.validate(final_output)
+        prompt = self.model(
+            template=form.template,
+            input_data=form.cleaned_data,
+            final_output=final_output,
+            is_valid=validation_report.is_valid,
+            validation_notes=validation_report.notes,
+            missing_variables=validation_report.unreplaced_variables,
+            validation_report=validation_report.get_summary(),
+        )
+        return prompt, validation_report
+    
+    def bulk_create_from_forms(self, forms, batch_size=200):
+        """
+        Generate, validate and insert prompts for many forms in batched INSERTs.
+        
+        Args:
+            forms: Iterable of validated DynamicPromptForm instances
+            batch_size: Maximum number of rows per INSERT statement
+            
+        Returns:
+            List of created GeneratedPrompt objects
+        """
+        prompts = [self.build_from_form(form)[0] for form in forms]
+        return self.bulk_create(prompts, batch_size=batch_size)
+
+
 class Template(models.Model):
     """
     Represents a BMAD template synced from a GitHub repository.
@@ -109,6 +183,11 @@ class Template(models.Model):
         blank=True,
         help_text="Detected variables in the template"
     )
+    parsed_sections = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Document sections parsed from the content, cached for the wizard"
+    )
     is_active = models.BooleanField(
         default=True,
         help_text="Whether this template is active and available for use"
@@ -127,6 +206,8 @@ class Template(models.Model):
         indexes = [
             models.Index(fields=['agent_role', 'workflow_phase']),
             models.Index(fields=['is_active', 'created_at']),
+            models.Index(fields=['is_active', 'agent_role']),
+            models.Index(fields=['is_active', 'workflow_phase']),
         ]
     
     def __str__(self):
@@ -137,23 +218,61 @@ class Template(models.Model):
         Extract variables from template content using regex patterns.
         Supports both {{VARIABLE_NAME}} and [VARIABLE_NAME] syntax.
         """
-        pattern = r'\{\{(\w+)\}\}|\[(\w+)\]'
-        matches = re.findall(pattern, self.content)
-        variables = set()
-        for match in matches:
-            variables.add(match[0] if match[0] else match[1])
-        return sorted(list(variables))
+        # One fused scan; findall's (double_brace, bracket) tuples are cheaper than Match objects
+        variables = {
+            double_brace or bracket
+            for double_brace, bracket in VARIABLE_PATTERN.findall(self.content)
+        }
+        return sorted(variables)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded content and variables so save() can tell whether they changed."""
+        instance = super().from_db(db, field_names, values)
+        # Stays None when content was deferred, which counts as changed
+        instance._loaded_content = instance.__dict__.get('content')
+        instance._loaded_variables = instance.__dict__.get('variables')
+        return instance
+    
+    def _content_changed(self):
+        """Return True if content is new or differs from what was loaded."""
+        return self._state.adding or self.content != getattr(self, '_loaded_content', None)
+    
+    def extract_sections(self):
+        """Parse document sections from content as JSON-serializable dicts."""
+        from dataclasses import asdict
+        # Imported here to avoid a circular import (services import the models)
+        from .services.document_generator import DocumentGenerator
+        
+        return [asdict(section) for section in DocumentGenerator.extract_sections(self.content)]
     
     def save(self, *args, **kwargs):
-        """Override save to auto-extract variables and sync agent_roles."""
-        self.variables = self.extract_variables()
+        """Override save to auto-extract variables and sections and sync agent_roles."""
+        self.refresh_derived_fields()
+        super().save(*args, **kwargs)
+        self._loaded_content = self.content
+        self._loaded_variables = self.variables
+    
+    def refresh_derived_fields(self):
+        """
+        Update variables, parsed_sections and agent_roles from the other fields.
+        
+        save() calls this automatically; call it before bulk_create/bulk_update,
+        which bypass save().
+        """
+        # Variables and sections only depend on content, so skip re-parsing when it is unchanged
+        content_changed = self._content_changed()
+        # Callers such as the local loader assign variables themselves; re-derive those too
+        if content_changed or self.variables != getattr(self, '_loaded_variables', None):
+            self.variables = self.extract_variables()
+        if content_changed:
+            self.parsed_sections = self.extract_sections()
         # Ensure agent_roles is initialized and includes the primary agent_role
         if self.agent_roles is None:
             self.agent_roles = []
         if self.agent_role and self.agent_role not in self.agent_roles:
             # Add primary role at the beginning, preserving other roles
             self.agent_roles = [self.agent_role] + [r for r in self.agent_roles if r != self.agent_role]
-        super().save(*args, **kwargs)
     
     def get_variables_list(self):
         """Return variables as a list."""
@@ -161,6 +280,27 @@ class Template(models.Model):
             return json.loads(self.variables)
         return self.variables or []
     
+    def get_sections(self):
+        """
+        Return the cached document sections as TemplateSection objects.
+        
+        Rows saved before sections were cached are parsed on demand.
+        """
+        from .services.document_generator import DocumentGenerator, TemplateSection
+        
+        if not self.parsed_sections:
+            return DocumentGenerator.extract_sections(self.content)
+        # JSON stores the section variables as a list; TemplateSection holds a tuple.
+        # Names are interned, as extract_sections does
+        return [
+            TemplateSection(**{
+                **section,
+                'name': sys.intern(section['name']),
+                'variables': tuple(sys.intern(var) for var in section.get('variables', ())),
+            })
+            for section in self.parsed_sections
+        ]
+    
     def get_roles_list(self):
         """Return all roles this template is associated with."""
         if self.agent_roles:
@@ -169,9 +309,8 @@ class Template(models.Model):
     
     def get_roles_display(self):
         """Return a human-readable string of all roles."""
-        role_dict = dict(settings.BMAD_AGENT_ROLES)
         roles = self.get_roles_list()
-        return ', '.join(role_dict.get(r, r) for r in roles)
+        return ', '.join(AGENT_ROLE_LABELS.get(r, r) for r in roles)
     
     def has_role(self, role: str) -> bool:
         """Check if this template is associated with a specific role."""
@@ -187,12 +326,11 @@ class Template(models.Model):
         Returns:
             str: Generated prompt with variables substituted
         """
-        result = self.content
-        for key, value in kwargs.items():
-            # Support both {{VAR}} and [VAR] syntax
-            result = result.replace('{{' + key + '}}', str(value))
-            result = result.replace('[' + key + ']', str(value))
-        return result
+        # Imported here to avoid a circular import (services import the models)
+        from .services.template_parser import TemplateParser
+        
+        # Single pass over content for both {{VAR}} and [VAR] syntax
+        return TemplateParser.substitute_variables(self.content, kwargs)
 
 
 class GeneratedPrompt(models.Model):
@@ -200,6 +338,9 @@ class GeneratedPrompt(models.Model):
     Represents a generated prompt with user input data and validation results.
     """
     
+    # Custom manager
+    objects = GeneratedPromptManager()
+    
     template = models.ForeignKey(
         Template,
         on_delete=models.CASCADE,
@@ -226,6 +367,11 @@ class GeneratedPrompt(models.Model):
         blank=True,
         help_text="List of variables that were not replaced"
     )
+    validation_report = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="BMAD validation summary computed when the prompt was generated"
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         help_text="When this prompt was generated"
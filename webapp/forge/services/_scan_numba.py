@@ -0,0 +1,156 @@
+"""
+Optional Numba kernels for scanning headings and variables in large ASCII documents.
+
+The kernels walk the raw bytes once and produce the same matches as the
+HEADING_PATTERN and VARIABLE_PATTERN regexes in document_generator. They are
+compiled only when numba and numpy are installed; AVAILABLE tells callers
+whether the accelerated scanners can be used. Byte offsets equal string
+offsets only for ASCII content, so callers must check content.isascii().
+"""
+
+from typing import List, Tuple
+
+try:
+    # Optional: pip install numba (pulls in numpy)
+    import numpy as np
+    from numba import njit
+except ImportError:
+    np = None
+    njit = None
+
+HASH = 35          # '#'
+SPACE = 32         # ' '
+TAB = 9            # '\t'
+NEWLINE = 10       # '\n'
+OPEN_BRACE = 123   # '{'
+CLOSE_BRACE = 125  # '}'
+OPEN_BRACKET = 91  # '['
+CLOSE_BRACKET = 93  # ']'
+
+
+def _is_word(c) -> bool:
+    """Return True for ASCII word characters ([A-Za-z0-9_])."""
+    return (48 <= c <= 57) or (65 <= c <= 90) or (97 <= c <= 122) or c == 95
+
+
+def _heading_kernel(buf, starts, ends, levels, name_starts, name_ends) -> int:
+    """
+    Find Markdown headings (^#{1,6}[ \\t]+(.+?)[ \\t]*$ per line) in buf.
+
+    Writes each heading's span, level and name span into the output
+    sequences and returns the number of headings found.
+    """
+    n = len(buf)
+    count = 0
+    line_start = 0
+    while line_start < n:
+        # Find the end of this line
+        line_end = line_start
+        while line_end < n and buf[line_end] != NEWLINE:
+            line_end += 1
+
+        level = 0
+        while line_start + level < line_end and buf[line_start + level] == HASH:
+            level += 1
+        pos = line_start + level
+        if 1 <= level <= 6 and pos < line_end and (buf[pos] == SPACE or buf[pos] == TAB):
+            name_start = pos
+            while name_start < line_end and (buf[name_start] == SPACE or buf[name_start] == TAB):
+                name_start += 1
+            name_end = line_end
+            while name_end > name_start and (buf[name_end - 1] == SPACE or buf[name_end - 1] == TAB):
+                name_end -= 1
+            if name_start == line_end and line_end - pos >= 2:
+                # Only whitespace: the regex takes the last blank as the name
+                name_start = line_end - 1
+                name_end = line_end
+            if name_end > name_start:
+                starts[count] = line_start
+                ends[count] = line_end
+                levels[count] = level
+                name_starts[count] = name_start
+                name_ends[count] = name_end
+                count += 1
+
+        line_start = line_end + 1
+    return count
+
+
+def _variable_kernel(buf, name_starts, name_ends) -> int:
+    """
+    Find {{VAR}} and [VAR] placeholders in buf, leftmost first like the regex.
+
+    Writes each variable name's span into the output sequences and returns
+    the number of placeholders found.
+    """
+    n = len(buf)
+    count = 0
+    i = 0
+    while i < n:
+        c = buf[i]
+        if c == OPEN_BRACE and i + 1 < n and buf[i + 1] == OPEN_BRACE:
+            j = i + 2
+            while j < n and _is_word(buf[j]):
+                j += 1
+            if j > i + 2 and j + 1 < n and buf[j] == CLOSE_BRACE and buf[j + 1] == CLOSE_BRACE:
+                name_starts[count] = i + 2
+                name_ends[count] = j
+                count += 1
+                i = j + 2
+                continue
+        elif c == OPEN_BRACKET:
+            j = i + 1
+            while j < n and _is_word(buf[j]):
+                j += 1
+            if j > i + 1 and j < n and buf[j] == CLOSE_BRACKET:
+                name_starts[count] = i + 1
+                name_ends[count] = j
+                count += 1
+                i = j + 1
+                continue
+        i += 1
+    return count
+
+
+AVAILABLE = njit is not None
+
+if AVAILABLE:
+    # cache=True stores the compiled kernels on disk so later runs skip compilation
+    _is_word = njit(cache=True)(_is_word)
+    _heading_kernel_jit = njit(cache=True)(_heading_kernel)
+    _variable_kernel_jit = njit(cache=True)(_variable_kernel)
+
+
+def scan_headings(content: str) -> Tuple[Tuple[int, str, int, int], ...]:
+    """
+    Find every Markdown heading in ASCII content with the compiled kernel.
+
+    Returns:
+        Tuple of (level, name, heading start, heading end) tuples, as
+        document_generator.scan_headings
+    """
+    buf = np.frombuffer(content.encode('ascii'), dtype=np.uint8)
+    # A heading takes at least three characters and a newline
+    size = len(buf) // 2 + 1
+    starts, ends, levels, name_starts, name_ends = (np.empty(size, dtype=np.int64) for _ in range(5))
+    count = _heading_kernel_jit(buf, starts, ends, levels, name_starts, name_ends)
+    return tuple(
+        (int(levels[i]), content[name_starts[i]:name_ends[i]].strip(), int(starts[i]), int(ends[i]))
+        for i in range(count)
+    )
+
+
+def scan_variable_names(content: str) -> List[str]:
+    """
+    Find the names of every {{VAR}} and [VAR] placeholder in ASCII content.
+
+    Returns:
+        Variable names in document order, repeats included
+    """
+    buf = np.frombuffer(content.encode('ascii'), dtype=np.uint8)
+    # A placeholder takes at least three characters
+    size = len(buf) // 3 + 1
+    name_starts = np.empty(size, dtype=np.int64)
+    name_ends = np.empty(size, dtype=np.int64)
+    count = _variable_kernel_jit(buf, name_starts, name_ends)
+    return [content[name_starts[i]:name_ends[i]] for i in range(count)]
@@ -2,9 +2,12 @@
 BMAD compliance validation service.
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
+from .document_generator import _word_count_at_least
 from .template_parser import TemplateParser
 
 
@@ -15,9 +18,9 @@ class ValidationSeverity(Enum):
     INFO = "info"
 
 
-@dataclass
+@dataclass(frozen=True)
 class ValidationResult:
-    """Result of a validation check."""
+    """Result of a validation check (immutable, so cached reports can share it)."""
     is_valid: bool
     severity: ValidationSeverity
     message: str
@@ -45,6 +48,16 @@ class BMADValidationReport:
         elif result.severity == ValidationSeverity.WARNING:
             self.score -= 5
     
+    def copy(self) -> 'BMADValidationReport':
+        """Return a copy with its own lists, sharing the immutable results."""
+        return replace(
+            self,
+            results=list(self.results),
+            missing_sections=list(self.missing_sections),
+            unreplaced_variables=list(self.unreplaced_variables),
+            notes=list(self.notes),
+        )
+    
     def get_summary(self) -> Dict:
         """Get a summary dictionary of the validation report."""
         return {
@@ -63,20 +76,10 @@ class BMADValidator:
     Service for validating generated prompts against BMAD framework requirements.
     """
     
-    REQUIRED_SECTIONS = [
-        '## Your Role',
-        '## Input',
-        '## Output Requirements',
-    ]
+    # Shared with TemplateParser, whose single-scan check finds them
+    REQUIRED_SECTIONS = TemplateParser.REQUIRED_SECTIONS
     
-    OPTIONAL_SECTIONS = [
-        '## Context',
-        '## Constraints',
-        '## Examples',
-        '## Step-by-Step Instructions',
-        '## Success Criteria',
-        '## Notes',
-    ]
+    OPTIONAL_SECTIONS = TemplateParser.OPTIONAL_SECTIONS
     
     ROLE_KEYWORDS = {
         'orchestrator': ['orchestrator', 'coordination', 'oversight', 'workflow'],
@@ -88,30 +91,89 @@ class BMADValidator:
         'qa': ['qa', 'quality assurance', 'tester', 'testing'],
     }
     
+    # Messages for each missing required section, built once so reports share them
+    MISSING_SECTION_MESSAGES = {
+        section: f"Missing required section: {section}" for section in REQUIRED_SECTIONS
+    }
+    QUICK_MISSING_MESSAGES = {section: f"Missing {section}" for section in REQUIRED_SECTIONS}
+    
+    # Words showing that '## Output Requirements' describes the expected format
+    FORMAT_KEYWORDS = ('format', 'structure', 'output', 'response', 'return')
+    
+    # Prompts at least this long are validated without caching, bounding cache memory
+    MAX_CACHED_CONTENT_LENGTH = 64_000
+    
+    # Minimum number of distinct prompts before validate_many uses worker processes
+    PARALLEL_VALIDATE_MIN = 50
+    
     @classmethod
     def validate(cls, prompt_content: str) -> BMADValidationReport:
         """
         Perform comprehensive BMAD validation on a prompt.
         
+        Reports for prompts shorter than MAX_CACHED_CONTENT_LENGTH are memoized
+        per content; every call returns its own copy.
+        
         Args:
             prompt_content: The generated prompt content
             
         Returns:
             BMADValidationReport with all validation results
         """
+        if len(prompt_content) >= cls.MAX_CACHED_CONTENT_LENGTH:
+            return cls._build_report(prompt_content)
+        return cls._validate_cached(prompt_content).copy()
+    
+    @classmethod
+    def validate_many(cls, prompt_contents: List[str]) -> List[BMADValidationReport]:
+        """
+        Validate a batch of prompts, e.g. for a repository-wide scan.
+        
+        Each distinct prompt is validated once. With at least
+        PARALLEL_VALIDATE_MIN distinct prompts, reports are built across CPU
+        cores in worker processes; smaller batches use validate() and its cache.
+        
+        Args:
+            prompt_contents: Prompt contents to validate
+            
+        Returns:
+            List of BMADValidationReport, one independent copy per input, in input order
+        """
+        distinct = list(dict.fromkeys(prompt_contents))
+        if len(distinct) >= cls.PARALLEL_VALIDATE_MIN:
+            with ProcessPoolExecutor() as executor:
+                reports = list(executor.map(cls._build_report, distinct, chunksize=8))
+        else:
+            reports = [cls.validate(content) for content in distinct]
+        
+        by_content = dict(zip(distinct, reports))
+        return [by_content[content].copy() for content in prompt_contents]
+    
+    @classmethod
+    @lru_cache(maxsize=512)
+    def _validate_cached(cls, prompt_content: str) -> BMADValidationReport:
+        """Build the validation report for prompt_content; memoized on the content string."""
+        return cls._build_report(prompt_content)
+    
+    @classmethod
+    def _build_report(cls, prompt_content: str) -> BMADValidationReport:
+        """Run every BMAD validation check on prompt_content."""
         report = BMADValidationReport()
-        content_lower = prompt_content.lower()
         
-        # 1. Check for required sections
-        for section in cls.REQUIRED_SECTIONS:
-            if section.lower() not in content_lower:
-                report.missing_sections.append(section)
-                report.add_result(ValidationResult(
-                    is_valid=False,
-                    severity=ValidationSeverity.ERROR,
-                    message=f"Missing required section: {section}",
-                    section=section,
-                ))
+        # Detect sections once; the required-section check and the structure checks
+        # below both use the result
+        sections = TemplateParser.detect_sections(prompt_content)
+        
+        # 1. Check for required sections (a frozenset difference against the detected ones)
+        missing = TemplateParser.missing_required_sections(sections)
+        for section in missing:
+            report.missing_sections.append(section)
+            report.add_result(ValidationResult(
+                is_valid=False,
+                severity=ValidationSeverity.ERROR,
+                message=cls.MISSING_SECTION_MESSAGES[section],
+                section=section,
+            ))
         
         # 2. Check for unreplaced variables
         unreplaced = TemplateParser.find_unreplaced_variables(prompt_content)
@@ -125,19 +187,9 @@ class BMADValidator:
             ))
         
         # 3. Check section structure and content
-        sections = TemplateParser.detect_sections(prompt_content)
-        
         # Check "Your Role" section has content
         if '## Your Role' in sections:
-            role_section = prompt_content[sections['## Your Role'][1]:]
-            next_section_pos = len(role_section)
-            for section in sections:
-                if section != '## Your Role':
-                    pos = role_section.lower().find(section.lower())
-                    if pos != -1:
-                        next_section_pos = pos
-                        break
-            role_content = role_section[:next_section_pos].strip()
+            role_content = cls._section_body(prompt_content, sections, '## Your Role')
             if len(role_content) < 10:
                 report.add_result(ValidationResult(
                     is_valid=False,
@@ -148,15 +200,7 @@ class BMADValidator:
         
         # 4. Check "Input" section has content
         if '## Input' in sections:
-            input_section = prompt_content[sections['## Input'][1]:]
-            next_section_pos = len(input_section)
-            for section in sections:
-                if section != '## Input':
-                    pos = input_section.lower().find(section.lower())
-                    if pos != -1:
-                        next_section_pos = pos
-                        break
-            input_content = input_section[:next_section_pos].strip()
+            input_content = cls._section_body(prompt_content, sections, '## Input')
             if len(input_content) < 10:
                 report.add_result(ValidationResult(
                     is_valid=False,
@@ -167,19 +211,11 @@ class BMADValidator:
         
         # 5. Check "Output Requirements" section
         if '## Output Requirements' in sections:
-            output_section = prompt_content[sections['## Output Requirements'][1]:]
-            next_section_pos = len(output_section)
-            for section in sections:
-                if section != '## Output Requirements':
-                    pos = output_section.lower().find(section.lower())
-                    if pos != -1:
-                        next_section_pos = pos
-                        break
-            output_content = output_section[:next_section_pos].strip()
+            output_content = cls._section_body(prompt_content, sections, '## Output Requirements')
             
             # Check for specific output format keywords
-            format_keywords = ['format', 'structure', 'output', 'response', 'return']
-            has_format_keyword = any(kw in output_content.lower() for kw in format_keywords)
+            output_lower = output_content.lower()
+            has_format_keyword = any(kw in output_lower for kw in cls.FORMAT_KEYWORDS)
             if not has_format_keyword:
                 report.add_result(ValidationResult(
                     is_valid=False,
@@ -197,8 +233,8 @@ class BMADValidator:
                 message="Prompt has fewer sections than recommended for BMAD compliance",
             ))
         
-        # 7. Check for meaningful content
-        word_count = len(prompt_content.split())
+        # 7. Check for meaningful content (counting stops at the last threshold)
+        word_count, _ = _word_count_at_least(prompt_content, 100)
         if word_count < 50:
             report.add_result(ValidationResult(
                 is_valid=False,
@@ -208,9 +244,9 @@ class BMADValidator:
         elif word_count < 100:
             report.notes.append("Prompt is relatively short; consider adding more context")
         
-        # 8. Check for variable usage (good practice)
-        variable_count = len(TemplateParser.extract_variables(prompt_content))
-        if variable_count > 0 and len(unreplaced) == 0:
+        # 8. Check for variable usage (good practice); only whether any variable
+        # remains matters, so stop at the first match instead of extracting them all
+        if not unreplaced and TemplateParser.VARIABLE_PATTERN.search(prompt_content):
             report.score += 10  # Bonus for using variables properly
         
         # 9. Optional sections bonus
@@ -223,6 +259,25 @@ class BMADValidator:
         
         return report
     
+    @classmethod
+    def _section_body(cls, prompt_content: str, sections: Dict[str, Tuple[int, int]], heading: str) -> str:
+        """
+        Return the stripped text after heading, up to the next detected section.
+        
+        The next section is the first one (in detection order) whose heading
+        appears after this one; the tail is lowercased once for all lookups.
+        """
+        tail = prompt_content[sections[heading][1]:]
+        tail_lower = tail.lower()
+        end = len(tail)
+        for section in sections:
+            if section != heading:
+                pos = tail_lower.find(section.lower())
+                if pos != -1:
+                    end = pos
+                    break
+        return tail[:end].strip()
+    
     @classmethod
     def quick_validate(cls, prompt_content: str) -> Tuple[bool, List[str]]:
         """
@@ -234,20 +289,31 @@ class BMADValidator:
         Returns:
             Tuple of (is_valid, list of issues)
         """
-        issues = []
-        content_lower = prompt_content.lower()
-        
+        if len(prompt_content) >= cls.MAX_CACHED_CONTENT_LENGTH:
+            is_valid, issues = cls._quick_check(prompt_content)
+        else:
+            is_valid, issues = cls._quick_validate_cached(prompt_content)
+        return is_valid, list(issues)
+    
+    @classmethod
+    @lru_cache(maxsize=512)
+    def _quick_validate_cached(cls, prompt_content: str) -> Tuple[bool, Tuple[str, ...]]:
+        """Run the quick checks on prompt_content; memoized on the content string."""
+        return cls._quick_check(prompt_content)
+    
+    @classmethod
+    def _quick_check(cls, prompt_content: str) -> Tuple[bool, Tuple[str, ...]]:
+        """Run the quick checks, returning (is_valid, issues as a tuple)."""
         # Check required sections
-        for section in cls.REQUIRED_SECTIONS:
-            if section.lower() not in content_lower:
-                issues.append(f"Missing {section}")
+        _, missing = TemplateParser.check_required_sections(prompt_content)
+        issues = [cls.QUICK_MISSING_MESSAGES[section] for section in missing]
         
         # Check for unreplaced variables
         unreplaced = TemplateParser.find_unreplaced_variables(prompt_content)
         if unreplaced:
             issues.append(f"Unreplaced variables: {', '.join(unreplaced)}")
         
-        return len(issues) == 0, issues
+        return len(issues) == 0, tuple(issues)
     
     @classmethod
     def validate_for_role(cls, prompt_content: str, role: str) -> ValidationResult:
@@ -3,23 +3,128 @@ Document generation service for interactive template-based document creation.
 """
 
 import re
-from typing import Dict, List, Tuple, Optional
+import sys
+from functools import lru_cache
+from itertools import islice
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Tuple, Optional
 from dataclasses import dataclass, field
 
+from . import _scan_numba
 
-@dataclass
+try:
+    # Optional: pip install google-re2
+    import re2
+except ImportError:
+    re2 = None
+
+
+# Compiled once at import and shared by every DocumentGenerator call
+HEADING_PATTERN = re.compile(r'^(#{1,6})[ \t]+(.+?)[ \t]*$', re.MULTILINE)
+VARIABLE_PATTERN = re.compile(r'\{\{(?P<double_brace>\w+)\}\}|\[(?P<single_bracket>\w+)\]')
+WORD_PATTERN = re.compile(r'\S+')
+
+# First characters of lines that never make up a section description
+DESCRIPTION_SKIP_FIRST = frozenset('#-*[')
+
+# Documents at least this long are scanned with the Numba kernels when available;
+# below it the regex engine wins over the cost of crossing into compiled code
+ACCELERATED_SCAN_MIN_LENGTH = 32_768
+
+
+# Sentinel for values missing from a substitution mapping
+_MISSING = object()
+
+
+def _compile_re2(pattern: str):
+    """
+    Compile pattern with RE2's linear-time engine.
+    
+    Returns None when google-re2 is not installed or rejects the pattern.
+    """
+    if re2 is None:
+        return None
+    try:
+        return re2.compile(pattern)
+    except re2.error:
+        return None
+
+
+def _use_accelerated_scan(content: str) -> bool:
+    """Return True when content should go through the Numba kernels."""
+    return (
+        _scan_numba.AVAILABLE
+        and len(content) >= ACCELERATED_SCAN_MIN_LENGTH
+        and content.isascii()
+    )
+
+
+def _word_count_at_least(text: str, n: int) -> Tuple[int, bool]:
+    """
+    Count words in text, stopping as soon as n have been seen.
+    
+    Returns:
+        Tuple of (word count, capped at n; whether text has at least n words)
+    """
+    count = 0
+    for _ in WORD_PATTERN.finditer(text):
+        count += 1
+        if count >= n:
+            break
+    return count, count >= n
+
+
+def scan_headings(content: str) -> Tuple[Tuple[int, str, int, int], ...]:
+    """
+    Find every Markdown heading in content in one pass.
+    
+    Args:
+        content: Markdown content
+        
+    Returns:
+        Tuple of (level, name, heading start, heading end) tuples in document order
+    """
+    if _use_accelerated_scan(content):
+        return _scan_numba.scan_headings(content)
+    return tuple(
+        (len(match.group(1)), match.group(2).strip(), match.start(), match.end())
+        for match in HEADING_PATTERN.finditer(content)
+    )
+
+
+@lru_cache(maxsize=128)
+def _extract_variables_cached(text: str) -> Tuple[str, ...]:
+    """Return the sorted, de-duplicated, interned variable names in text (memoized)."""
+    # Dedupe straight from the match stream, without findall's tuple list
+    variables = {}
+    if _use_accelerated_scan(text):
+        for name in _scan_numba.scan_variable_names(text):
+            variables[sys.intern(name)] = None
+    else:
+        for match in VARIABLE_PATTERN.finditer(text):
+            variables[sys.intern(match.group(match.lastgroup))] = None
+    return tuple(sorted(variables))
+
+
+@dataclass(frozen=True, slots=True)
 class TemplateSection:
-    """Represents a section in a template document."""
+    """Represents a section in a template document (immutable and hashable, so it can be cached)."""
     name: str
     level: int  # Heading level (1-6)
     content: str
     description: str = ""
     start_pos: int = 0
     end_pos: int = 0
-    variables: List[str] = field(default_factory=list)
+    variables: Tuple[str, ...] = ()
+    name_lower: str = ""  # Lowercased name, derived from name when not given
+    
+    def __post_init__(self):
+        if not self.name_lower:
+            # Frozen dataclass: set the derived field directly
+            object.__setattr__(self, 'name_lower', self.name.lower())
 
 
-@dataclass
+@dataclass(slots=True)
 class RealTimeValidation:
     """Real-time validation result for a section."""
     is_valid: bool
@@ -30,86 +135,189 @@ class RealTimeValidation:
     unreplaced_variables: List[str] = field(default_factory=list)
 
 
+@dataclass(frozen=True, slots=True)
+class ComplianceReport:
+    """Document compliance results in compact, immutable form."""
+    is_compliant: bool
+    compliance_score: int
+    missing_sections: Tuple[str, ...] = ()
+    unreplaced_variables: Tuple[str, ...] = ()
+    issues: Tuple[str, ...] = ()
+    warnings: Tuple[str, ...] = ()
+    
+    def to_dict(self) -> Dict:
+        """Return the report as a dictionary with fresh lists."""
+        return {
+            'is_compliant': self.is_compliant,
+            'compliance_score': self.compliance_score,
+            'missing_sections': list(self.missing_sections),
+            'unreplaced_variables': list(self.unreplaced_variables),
+            'issues': list(self.issues),
+            'warnings': list(self.warnings),
+        }
+
+
 class DocumentGenerator:
     """
     Service for interactive document generation from templates.
     Extracts sections, manages wizard-based input, and provides real-time validation.
     """
     
-    # Section heading patterns
-    HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.+)$', re.MULTILINE)
-    VARIABLE_PATTERN = re.compile(r'\{\{(\w+)\}\}|\[(\w+)\]')
+    # Section heading and variable patterns (module-level compiled objects)
+    HEADING_PATTERN = HEADING_PATTERN
+    VARIABLE_PATTERN = VARIABLE_PATTERN
+    
+    # Keywords that indicate a section already covers what its suggestion asks for;
+    # substring matches, so e.g. 'tasks' satisfies 'task'
+    ROLE_KEYWORDS_PATTERN = re.compile(
+        r'responsibility|task|goal|objective|you will', re.IGNORECASE
+    )
+    INPUT_KEYWORDS_PATTERN = re.compile(r'provide|given|receive|include', re.IGNORECASE)
+    OUTPUT_KEYWORDS_PATTERN = re.compile(
+        r'format|structure|include|return|produce', re.IGNORECASE
+    )
+    
+    # (section name tags, keywords pattern, suggestion) rules: a section whose
+    # lowercased name contains any tag gets the suggestion unless the pattern matches
+    SUGGESTION_RULES = (
+        (
+            ('role',),
+            ROLE_KEYWORDS_PATTERN,
+            "Consider specifying clear responsibilities or objectives for this role.",
+        ),
+        (
+            ('input',),
+            INPUT_KEYWORDS_PATTERN,
+            "Consider specifying what inputs or data will be provided.",
+        ),
+        (
+            ('output', 'requirement'),
+            OUTPUT_KEYWORDS_PATTERN,
+            "Consider specifying the expected output format or structure.",
+        ),
+    )
+    
+    # Required BMAD section headings, matched case-insensitively
+    REQUIRED_SECTIONS = ('## Your Role', '## Input', '## Output Requirements')
+    # Required headings and variable placeholders in one case-insensitive alternation,
+    # so compliance checks find both in a single pass
+    COMPLIANCE_PATTERN_SOURCE = (
+        '(?i)(?P<section>' + '|'.join(re.escape(section) for section in REQUIRED_SECTIONS) + ')'
+        '|' + VARIABLE_PATTERN.pattern
+    )
+    COMPLIANCE_PATTERN = re.compile(COMPLIANCE_PATTERN_SOURCE)
+    # Optional RE2 (DFA) build of the same alternation (None without google-re2);
+    # RE2's \w is ASCII-only, so it is used for ASCII content only
+    COMPLIANCE_DFA = _compile_re2(COMPLIANCE_PATTERN_SOURCE)
+    
+    # Required sections with their lowercased form and issue message, built once so
+    # every compliance report shares the same string objects
+    REQUIRED_SECTION_CHECKS = tuple(
+        (section, section.lower(), f"Missing required section: {section}")
+        for section in REQUIRED_SECTIONS
+    )
     
     # Minimum content requirements
     MIN_SECTION_WORDS = 10
+    MIN_DOCUMENT_WORDS = 50
     MIN_MEANINGFUL_LENGTH = 20
     
+    # Content at least this long is parsed without caching, bounding cache memory
+    MAX_CACHED_CONTENT_LENGTH = 64_000
+    
     @classmethod
     def extract_sections(cls, content: str) -> List[TemplateSection]:
         """
         Extract all sections from template content.
         
+        Results for content shorter than MAX_CACHED_CONTENT_LENGTH are memoized
+        per content string, so the wizard and document generation can re-derive
+        sections for the same template cheaply.
+        
         Args:
             content: Template content string
             
         Returns:
             List of TemplateSection objects
         """
+        return list(cls._sections(content))
+    
+    @classmethod
+    def _sections(cls, content: str) -> Tuple[TemplateSection, ...]:
+        """Return the sections of content, from the cache unless content is too long to keep."""
+        if len(content) >= cls.MAX_CACHED_CONTENT_LENGTH:
+            return cls._parse_sections(content)
+        return cls._extract_sections_cached(content)
+    
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _extract_sections_cached(cls, content: str) -> Tuple[TemplateSection, ...]:
+        """Parse sections from content; memoized on the content string."""
+        return cls._parse_sections(content)
+    
+    @classmethod
+    def _parse_sections(cls, content: str) -> Tuple[TemplateSection, ...]:
+        """Parse every Markdown section of content."""
         sections = []
-        matches = list(cls.HEADING_PATTERN.finditer(content))
+        describe = cls._generate_section_description
+        headings = scan_headings(content)
         
-        for i, match in enumerate(matches):
-            heading_level = len(match.group(1))
-            section_name = match.group(2).strip()
-            start_pos = match.end()
+        for i, (heading_level, section_name, heading_start, start_pos) in enumerate(headings):
+            # Interned: names are used as lookup keys into the wizard's section data
+            section_name = sys.intern(section_name)
             
-            # Determine end position (next heading or end of content)
-            if i + 1 < len(matches):
-                end_pos = matches[i + 1].start()
-            else:
-                end_pos = len(content)
+            # Section bodies run from the end of one heading to the start of the next
+            end_pos = headings[i + 1][2] if i + 1 < len(headings) else len(content)
             
             section_content = content[start_pos:end_pos].strip()
             
             # Extract variables in this section
-            variables = cls._extract_variables_from_text(section_content)
+            variables = _extract_variables_cached(section_content)
             
             # Generate description from first few lines
-            description = cls._generate_section_description(section_content)
+            description = describe(section_content)
             
             section = TemplateSection(
                 name=section_name,
                 level=heading_level,
                 content=section_content,
                 description=description,
-                start_pos=match.start(),
+                start_pos=heading_start,
                 end_pos=end_pos,
                 variables=variables,
+                name_lower=section_name.lower(),
             )
             sections.append(section)
         
-        return sections
+        return tuple(sections)
     
     @classmethod
     def _extract_variables_from_text(cls, text: str) -> List[str]:
         """Extract variable names from text."""
-        matches = cls.VARIABLE_PATTERN.findall(text)
-        variables = set()
-        for match in matches:
-            var_name = match[0] if match[0] else match[1]
-            variables.add(var_name)
-        return sorted(list(variables))
+        # Cached: the same section text is re-validated repeatedly while editing
+        return list(_extract_variables_cached(text))
     
     @classmethod
     def _generate_section_description(cls, content: str) -> str:
         """Generate a brief description from section content."""
-        lines = content.strip().split('\n')
+        content = content.lstrip()
         description_lines = []
         
-        for line in lines[:3]:
-            line = line.strip()
-            if line and not line.startswith(('#', '-', '*', '1.', '[')):
+        # Look at the first three lines only, without splitting the whole section
+        start = 0
+        for _ in range(3):
+            newline = content.find('\n', start)
+            line_end = newline if newline != -1 else len(content)
+            line = content[start:line_end].strip()
+            # Skip headings, list items and placeholders: one set lookup on the first
+            # character, plus a prefix check only for numbered lists
+            if line and line[0] not in DESCRIPTION_SKIP_FIRST and not (
+                line[0] == '1' and line.startswith('1.')
+            ):
                 description_lines.append(line)
+            if newline == -1:
+                break
+            start = newline + 1
         
         description = ' '.join(description_lines)
         if len(description) > 150:
@@ -121,39 +329,54 @@ class DocumentGenerator:
         """
         Generate questions to ask the user for a section.
         
+        Questions are memoized per section (sections are frozen and hashable), so
+        each wizard request re-rendering the same template reuses them.
+        
         Args:
             section: The template section
             
         Returns:
             List of question dictionaries
         """
+        return [dict(question) for question in cls._section_questions_cached(section)]
+    
+    @classmethod
+    @lru_cache(maxsize=512)
+    def _section_questions_cached(cls, section: TemplateSection) -> Tuple[MappingProxyType, ...]:
+        """Build the read-only questions for section; memoized on the section."""
         questions = []
         
         # If section has variables, create questions for each
-        if section.variables:
-            for var in section.variables:
-                questions.append({
-                    'type': 'variable',
-                    'name': var,
-                    'label': var.replace('_', ' ').title(),
-                    'placeholder': f"Enter value for {var}",
-                    'required': True,
-                })
+        for var in section.variables:
+            questions.append({
+                'type': 'variable',
+                'name': var,
+                'label': var.replace('_', ' ').title(),
+                'placeholder': f"Enter value for {var}",
+                'required': True,
+            })
         
         # Add a content question for the section itself
         questions.append({
             'type': 'content',
-            'name': f'section_{section.name.lower().replace(" ", "_")}',
+            'name': f'section_{section.name_lower.replace(" ", "_")}',
             'label': f"Content for '{section.name}'",
             'placeholder': section.description or f"Enter content for {section.name}",
             'required': False,
             'is_textarea': True,
         })
         
-        return questions
+        return tuple(MappingProxyType(question) for question in questions)
     
     @classmethod
-    def validate_section_content(cls, section_name: str, content: str) -> RealTimeValidation:
+    def validate_section_content(
+        cls,
+        section_name: str,
+        content: str,
+        section_name_lower: Optional[str] = None,
+        *,
+        unreplaced: Optional[Tuple[str, ...]] = None,
+    ) -> RealTimeValidation:
         """
         Perform real-time validation on section content.
         
@@ -166,6 +389,10 @@ class DocumentGenerator:
         Args:
             section_name: Name of the section being validated
             content: Content to validate
+            section_name_lower: Precomputed section_name.lower()
+                (e.g. TemplateSection.name_lower); computed when omitted
+            unreplaced: Variable names already extracted from content
+                (e.g. TemplateSection.variables); extracted when omitted
             
         Returns:
             RealTimeValidation result
@@ -176,17 +403,18 @@ class DocumentGenerator:
         )
         
         # Check for unreplaced variables (100% detection rate requirement)
-        unreplaced = cls._extract_variables_from_text(content)
+        if unreplaced is None:
+            unreplaced = cls._extract_variables_from_text(content)
         if unreplaced:
             result.is_valid = False
-            result.unreplaced_variables = unreplaced
+            result.unreplaced_variables = list(unreplaced)
             result.issues.append(
                 f"Unreplaced variables found: {', '.join(unreplaced)}"
             )
         
-        # Check for minimum content length
-        word_count = len(content.split())
-        if word_count < cls.MIN_SECTION_WORDS:
+        # Check for minimum content length (counting stops at the threshold)
+        word_count, long_enough = _word_count_at_least(content, cls.MIN_SECTION_WORDS)
+        if not long_enough:
             result.warnings.append(
                 f"Section content seems short ({word_count} words). "
                 f"Consider adding more detail for clarity."
@@ -200,48 +428,28 @@ class DocumentGenerator:
             )
         
         # Suggest improvements based on content analysis
-        cls._add_content_suggestions(section_name, content, result)
+        if section_name_lower is None:
+            section_name_lower = section_name.lower()
+        cls._add_content_suggestions(section_name_lower, content, result)
         
         return result
     
     @classmethod
     def _add_content_suggestions(
-        cls, section_name: str, content: str, result: RealTimeValidation
+        cls, section_lower: str, content: str, result: RealTimeValidation
     ) -> None:
-        """Add content improvement suggestions based on section type."""
-        section_lower = section_name.lower()
-        content_lower = content.lower()
-        
-        # Role section suggestions
-        if 'role' in section_lower:
-            if not any(word in content_lower for word in 
-                      ['responsibility', 'task', 'goal', 'objective', 'you will']):
-                result.suggestions.append(
-                    "Consider specifying clear responsibilities or objectives for this role."
-                )
-        
-        # Input section suggestions
-        if 'input' in section_lower:
-            if not any(word in content_lower for word in 
-                      ['provide', 'given', 'receive', 'include']):
-                result.suggestions.append(
-                    "Consider specifying what inputs or data will be provided."
-                )
-        
-        # Output section suggestions
-        if 'output' in section_lower or 'requirement' in section_lower:
-            if not any(word in content_lower for word in 
-                      ['format', 'structure', 'include', 'return', 'produce']):
-                result.suggestions.append(
-                    "Consider specifying the expected output format or structure."
-                )
+        """Add content improvement suggestions based on the lowercased section name."""
+        for tags, keywords_pattern, suggestion in cls.SUGGESTION_RULES:
+            if any(tag in section_lower for tag in tags) and not keywords_pattern.search(content):
+                result.suggestions.append(suggestion)
     
     @classmethod
     def generate_document(
         cls, 
         template_content: str, 
         section_data: Dict[str, str],
-        variable_data: Dict[str, str]
+        variable_data: Dict[str, str],
+        sections: Optional[List[TemplateSection]] = None,
     ) -> Tuple[str, List[RealTimeValidation]]:
         """
         Generate a complete document from template with user-provided section data.
@@ -250,38 +458,54 @@ class DocumentGenerator:
             template_content: Original template content
             section_data: Dictionary mapping section names to user content
             variable_data: Dictionary mapping variable names to values
+            sections: Sections previously extracted from template_content
+                (e.g. Template.get_sections()); parsed here when omitted
             
         Returns:
             Tuple of (generated document, list of validation results)
         """
-        result = template_content
         validations = []
         
-        # First, substitute all variables
-        for var_name, value in variable_data.items():
-            result = result.replace('{{' + var_name + '}}', str(value))
-            result = result.replace('[' + var_name + ']', str(value))
+        substitute = cls._substitute_variables
+        unreplaced = set()
+        
+        # Sections come from the template itself, so their names match the wizard
+        # step names and their offsets index into template_content
+        if sections is None:
+            sections = cls.extract_sections(template_content)
         
-        # Replace section content where provided
-        sections = cls.extract_sections(result)
+        # Splice user content in at section offsets, substituting variables in the
+        # template slices between insertion points (collecting any left unreplaced),
+        # and join the pieces once at the end
+        pieces = []
+        cursor = 0
         for section in sections:
             if section.name in section_data and section_data[section.name]:
                 user_content = section_data[section.name]
                 
                 # Validate the section content
-                validation = cls.validate_section_content(section.name, user_content)
+                validation = cls.validate_section_content(
+                    section.name, user_content, section.name_lower
+                )
                 validations.append(validation)
                 
                 # If the section has the original template content, append user content
                 # Otherwise replace placeholder content
                 if section.content.strip():
-                    # Append user content after existing content
-                    old_section = section.content
-                    new_section = f"{section.content}\n\n{user_content}"
-                    result = result.replace(old_section, new_section, 1)
-        
-        # Final validation pass for unreplaced variables
-        final_unreplaced = cls._extract_variables_from_text(result)
+                    # Append user content right after the existing (stripped) content
+                    insert_at = section.start_pos + len(
+                        template_content[section.start_pos:section.end_pos].rstrip()
+                    )
+                    pieces.append(substitute(template_content[cursor:insert_at], variable_data, unreplaced))
+                    pieces.append(f"\n\n{user_content}")
+                    cursor = insert_at
+                    # Inserted user content is not substituted, so its placeholders remain
+                    unreplaced.update(validation.unreplaced_variables)
+        pieces.append(substitute(template_content[cursor:], variable_data, unreplaced))
+        result = ''.join(pieces)
+        
+        # Report unreplaced variables without rescanning the whole document
+        final_unreplaced = sorted(unreplaced)
         if final_unreplaced:
             validations.append(RealTimeValidation(
                 is_valid=False,
@@ -293,22 +517,69 @@ class DocumentGenerator:
         return result, validations
     
     @classmethod
-    def get_wizard_steps(cls, content: str) -> List[Dict]:
+    def _substitute_variables(
+        cls, text: str, variable_data: Dict[str, str], unreplaced: Optional[set] = None
+    ) -> str:
+        """
+        Replace {{VAR}} and [VAR] placeholders in text with provided values in one pass.
+        
+        Placeholders without a value are left in place and, when an
+        ``unreplaced`` set is given, their names are added to it.
+        """
+        # Most user-written section text has no placeholder openers at all
+        if '{{' not in text and '[' not in text:
+            return text
+        
+        def replace(match):
+            var_name = match.group(match.lastgroup)
+            # One dict lookup per placeholder; None is a valid value, hence the sentinel
+            value = variable_data.get(var_name, _MISSING)
+            if value is not _MISSING:
+                return str(value)
+            if unreplaced is not None:
+                unreplaced.add(var_name)
+            return match.group(0)
+        
+        return VARIABLE_PATTERN.sub(replace, text)
+    
+    @classmethod
+    def get_wizard_steps(
+        cls, content: str, sections: Optional[List[TemplateSection]] = None
+    ) -> List[Dict]:
         """
         Generate wizard steps from template content.
         
         Args:
             content: Template content
+            sections: Sections previously extracted from content; parsed here when omitted
             
         Returns:
             List of wizard step configurations
         """
-        sections = cls.extract_sections(content)
-        steps = []
+        return list(cls.iter_wizard_steps(content, sections))
+    
+    @classmethod
+    def iter_wizard_steps(
+        cls, content: str, sections: Optional[List[TemplateSection]] = None, start: int = 1
+    ) -> Iterator[Dict]:
+        """
+        Generate wizard steps one at a time, for callers that need only some of them.
+        
+        Args:
+            content: Template content
+            sections: Sections previously extracted from content; parsed here when omitted
+            start: Step number (1-based) of the first step to generate
+            
+        Yields:
+            Wizard step configurations, in section order
+        """
+        if sections is None:
+            # Iterate the cached sections directly rather than a fresh list copy
+            sections = cls._sections(content)
         
-        for i, section in enumerate(sections):
-            step = {
-                'step_number': i + 1,
+        for i, section in enumerate(islice(sections, start - 1, None), start):
+            yield {
+                'step_number': i,
                 'section_name': section.name,
                 'section_level': section.level,
                 'description': section.description,
@@ -316,9 +587,6 @@ class DocumentGenerator:
                 'questions': cls.get_section_questions(section),
                 'original_content': section.content[:500] + '...' if len(section.content) > 500 else section.content,
             }
-            steps.append(step)
-        
-        return steps
     
     @classmethod
     def validate_document_compliance(cls, content: str) -> Dict:
@@ -336,46 +604,61 @@ class DocumentGenerator:
         Returns:
             Compliance validation report
         """
-        report = {
-            'is_compliant': True,
-            'compliance_score': 100,
-            'missing_sections': [],
-            'unreplaced_variables': [],
-            'issues': [],
-            'warnings': [],
-        }
+        # Documents carry the user's own section content, so each one is new and not cached
+        return cls._build_compliance_report(content).to_dict()
+    
+    @classmethod
+    def _build_compliance_report(cls, content: str) -> ComplianceReport:
+        """Build the compliance report for content in compact immutable form."""
+        score = 100
+        missing_sections = []
+        issues = []
+        warnings = []
+        
+        # Collect required sections and unreplaced variables in one scan
+        found = set()
+        variables = {}
+        if cls.COMPLIANCE_DFA is not None and content.isascii():
+            pattern = cls.COMPLIANCE_DFA
+        else:
+            pattern = cls.COMPLIANCE_PATTERN
+        for match in pattern.finditer(content):
+            # Dispatch on the groups themselves, which both engines support
+            if match.group('section') is not None:
+                found.add(match.group(0).lower())
+            else:
+                name = match.group('double_brace') or match.group('single_bracket')
+                variables[sys.intern(name)] = None
         
         # Check for required BMAD sections (100% detection for missing sections)
-        required_sections = ['## Your Role', '## Input', '## Output Requirements']
-        content_lower = content.lower()
-        
-        for section in required_sections:
-            if section.lower() not in content_lower:
-                report['missing_sections'].append(section)
-                report['compliance_score'] -= 20
-                report['issues'].append(f"Missing required section: {section}")
+        for section, section_lower, issue in cls.REQUIRED_SECTION_CHECKS:
+            if section_lower not in found:
+                missing_sections.append(section)
+                score -= 20
+                issues.append(issue)
         
         # Check for unreplaced variables (100% detection)
-        unreplaced = cls._extract_variables_from_text(content)
+        unreplaced = tuple(sorted(variables))
         if unreplaced:
-            report['unreplaced_variables'] = unreplaced
-            report['compliance_score'] -= 15 * len(unreplaced)
-            report['issues'].append(
+            score -= 15 * len(unreplaced)
+            issues.append(
                 f"Unreplaced variables detected: {', '.join(unreplaced)}"
             )
         
-        # Check minimum content requirements
-        word_count = len(content.split())
-        if word_count < 50:
-            report['warnings'].append(
+        # Check minimum content requirements (counting stops at the threshold)
+        word_count, long_enough = _word_count_at_least(content, cls.MIN_DOCUMENT_WORDS)
+        if not long_enough:
+            warnings.append(
                 f"Document is relatively short ({word_count} words)"
             )
-            report['compliance_score'] -= 5
-        
-        # Determine overall compliance
-        if report['missing_sections'] or report['unreplaced_variables']:
-            report['is_compliant'] = False
-        
-        report['compliance_score'] = max(0, report['compliance_score'])
-        
-        return report
+            score -= 5
+        
+        return ComplianceReport(
+            # Compliant only without missing sections or unreplaced variables
+            is_compliant=not missing_sections and not unreplaced,
+            compliance_score=max(0, score),
+            missing_sections=tuple(missing_sections),
+            unreplaced_variables=unreplaced,
+            issues=tuple(issues),
+            warnings=tuple(warnings),
+        )
@@ -7,18 +7,77 @@ import requests
 import json
 import base64
 import re
+import threading
 import yaml
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from typing import List, Dict, Optional, Tuple
 from django.conf import settings
 from django.utils import timezone
 from ..models import Template
 
 
+# Valid role and phase identifiers, resolved from settings once. Tuples rather than
+# frozensets: frontmatter values may be unhashable (lists/dicts) when tested with `in`.
+VALID_AGENT_ROLES = tuple(role for role, _ in settings.BMAD_AGENT_ROLES)
+VALID_WORKFLOW_PHASES = tuple(phase for phase, _ in settings.BMAD_WORKFLOW_PHASES)
+
+# Keyword rules for role and phase detection: (substrings, result) pairs checked in
+# priority order, so the first matching rule wins wherever its keyword appears
+FILENAME_ROLE_RULES = (
+    (('orchestrator',), 'orchestrator'),
+    (('analyst',), 'analyst'),
+    (('pm', 'project_manager'), 'pm'),
+    (('architect',), 'architect'),
+    (('scrum',), 'scrum_master'),
+    (('developer', 'dev'), 'developer'),
+    (('qa', 'test', 'quality'), 'qa'),
+)
+ROLE_SECTION_RULES = (
+    (('orchestrator',), 'orchestrator'),
+    (('analyst',), 'analyst'),
+    (('project manager',), 'pm'),
+    (('architect',), 'architect'),
+    (('scrum master',), 'scrum_master'),
+    (('developer',), 'developer'),
+    (('qa engineer', 'quality assurance'), 'qa'),
+)
+FILENAME_PHASE_RULES = (
+    (('planning', 'plan'), 'planning'),
+    (('development', 'dev', 'sprint'), 'development'),
+)
+CONTENT_PHASE_RULES = (
+    (('planning phase',), 'planning'),
+    (('development phase',), 'development'),
+)
+# Last-resort phase heuristic: whichever keyword group has more hits in the content
+PLANNING_CONTENT_KEYWORDS = ('requirements', 'analysis', 'estimate', 'roadmap', 'backlog')
+DEVELOPMENT_CONTENT_KEYWORDS = ('implementation', 'code', 'feature', 'refactor', 'testing')
+
+
+def _match_keyword_rules(text: str, rules) -> Optional[str]:
+    """Return the result of the first rule with a keyword in text, or None."""
+    for keywords, result in rules:
+        for keyword in keywords:
+            if keyword in text:
+                return result
+    return None
+
+
 class GitHubSyncService:
     """
     Service for synchronizing BMAD templates from GitHub repositories.
     """
     
+    # Request headers shared by every instance; read-only so instances copy it
+    BASE_HEADERS = MappingProxyType({
+        'Accept': 'application/vnd.github.v3+json',
+    })
+    
+    # Most ETag-validated API responses one service keeps, least recently used evicted first
+    RESPONSE_CACHE_SIZE = 512
+    
     def __init__(self, token: Optional[str] = None):
         """
         Initialize the GitHub sync service.
@@ -27,11 +86,68 @@ class GitHubSyncService:
             token: GitHub personal access token for API authentication
         """
         self.token = token or settings.GITHUB_TOKEN
-        self.headers = {
-            'Accept': 'application/vnd.github.v3+json',
-        }
         if self.token:
-            self.headers['Authorization'] = f'Bearer {self.token}'
+            self.headers = {**self.BASE_HEADERS, 'Authorization': f'Bearer {self.token}'}
+        else:
+            self.headers = dict(self.BASE_HEADERS)
+        # One session per service keeps connections (and TLS sessions) alive between calls
+        self.session = requests.Session()
+        # ETag-validated responses, (url, ref) -> (etag, response text); scoped to this
+        # service (one sync run) so bodies never outlive it, and shared by its fetch threads
+        self._response_cache = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+    
+    def __getstate__(self):
+        """Pickle without the response cache and its lock, e.g. for worker processes."""
+        state = self.__dict__.copy()
+        del state['_response_cache'], state['_response_cache_lock']
+        return state
+    
+    def __setstate__(self, state):
+        """Restore a pickled service with an empty response cache of its own."""
+        self.__dict__.update(state)
+        self._response_cache = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+    
+    def _get_json(self, url: str, params: Dict):
+        """
+        GET a GitHub API URL and decode its JSON body, revalidating cached responses.
+        
+        Responses with an ETag are cached; later requests send If-None-Match and
+        reuse the cached body on 304 Not Modified, which GitHub does not count
+        against the rate limit.
+        
+        Raises:
+            requests.RequestException: On connection errors or error statuses
+            json.JSONDecodeError: If the body is not valid JSON
+        """
+        key = (url, params.get('ref'))
+        with self._response_cache_lock:
+            cached = self._response_cache.get(key)
+        
+        headers = self.headers
+        if cached is not None:
+            headers = {**headers, 'If-None-Match': cached[0]}
+        response = self.session.get(url, headers=headers, params=params, timeout=30)
+        
+        if response.status_code == 304 and cached is not None:
+            text = cached[1]
+            with self._response_cache_lock:
+                if key in self._response_cache:
+                    self._response_cache.move_to_end(key)
+        else:
+            response.raise_for_status()
+            text = response.text
+            etag = response.headers.get('ETag')
+            if etag:
+                with self._response_cache_lock:
+                    self._response_cache[key] = (etag, text)
+                    self._response_cache.move_to_end(key)
+                    if len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+                        self._response_cache.popitem(last=False)
+        
+        # Cached as text and decoded per call, so callers never share parsed objects
+        return json.loads(text)
     
     def get_raw_url(self, owner: str, repo: str, branch: str, path: str) -> str:
         """
@@ -56,10 +172,7 @@ class GitHubSyncService:
         params = {'ref': branch} if branch else {}
         
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._get_json(url, params)
             if data.get('encoding') == 'base64':
                 return base64.b64decode(data['content']).decode('utf-8')
             return data.get('content', '')
@@ -85,9 +198,7 @@ class GitHubSyncService:
         params = {'ref': branch} if branch else {}
         
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            response.raise_for_status()
-            return response.json()
+            return self._get_json(url, params)
             
         except (requests.RequestException, json.JSONDecodeError) as e:
             print(f"Error fetching directory {path}: {e}")
@@ -96,18 +207,22 @@ class GitHubSyncService:
     # Maximum recursion depth to prevent excessive API calls or stack overflow
     MAX_RECURSION_DEPTH = 10
     
+    # Concurrent directory listing requests while walking one level of a tree
+    DIRECTORY_FETCH_WORKERS = 8
+    
     def fetch_directory_contents_recursive(
         self, 
         owner: str, 
         repo: str, 
         branch: str, 
         path: str,
-        _current_depth: int = 0,
-        _visited_paths: set = None
     ) -> List[Dict]:
         """
         Recursively fetch the contents of a directory and all subdirectories from GitHub.
         
+        Directory listings are fetched level by level (breadth-first), then the
+        files are collected in depth-first order, as a recursive walk would list them.
+        
         Includes protection against:
         - Excessive recursion depth (max 10 levels)
         - Circular references via symlinks (tracks visited paths)
@@ -117,46 +232,78 @@ class GitHubSyncService:
             repo: Repository name
             branch: Branch name
             path: Directory path in the repository
-            _current_depth: Internal counter for recursion depth (do not set manually)
-            _visited_paths: Internal set of visited paths to prevent cycles (do not set manually)
             
         Returns:
             List of all file information dictionaries (flattened from all subdirectories)
         """
-        # Initialize visited paths set on first call
-        if _visited_paths is None:
-            _visited_paths = set()
-        
-        # Check recursion depth limit
-        if _current_depth >= self.MAX_RECURSION_DEPTH:
-            print(f"Warning: Maximum recursion depth ({self.MAX_RECURSION_DEPTH}) reached at path: {path}")
-            return []
-        
-        # Check for circular references
-        if path in _visited_paths:
-            print(f"Warning: Circular reference detected, skipping path: {path}")
-            return []
-        
-        _visited_paths.add(path)
+        listings = self._fetch_directory_listings(owner, repo, branch, path)
+        
+        def enter(dir_path: str, depth: int):
+            """Return the items to walk in dir_path, or None if it must be skipped."""
+            # Check recursion depth limit
+            if depth >= self.MAX_RECURSION_DEPTH:
+                print(f"Warning: Maximum recursion depth ({self.MAX_RECURSION_DEPTH}) reached at path: {dir_path}")
+                return None
+            # Check for circular references
+            if dir_path in visited_paths:
+                print(f"Warning: Circular reference detected, skipping path: {dir_path}")
+                return None
+            visited_paths.add(dir_path)
+            if dir_path not in listings:
+                # Reached deeper than the breadth-first pass went (only via revisited paths)
+                listings[dir_path] = self.fetch_directory_contents(owner, repo, branch, dir_path)
+            return iter(listings[dir_path])
         
         all_files = []
-        contents = self.fetch_directory_contents(owner, repo, branch, path)
-        
-        for item in contents:
-            if item.get('type') == 'file':
+        visited_paths = set()
+        root = enter(path, 0)
+        # Explicit stack of (items iterator, depth) instead of recursive calls
+        stack = [(root, 0)] if root is not None else []
+        while stack:
+            items, depth = stack[-1]
+            item = next(items, None)
+            if item is None:
+                stack.pop()
+            elif item.get('type') == 'file':
                 all_files.append(item)
             elif item.get('type') == 'dir':
-                # Recursively fetch contents of subdirectory
-                subdir_path = item.get('path', '')
-                subdir_files = self.fetch_directory_contents_recursive(
-                    owner, repo, branch, subdir_path,
-                    _current_depth=_current_depth + 1,
-                    _visited_paths=_visited_paths
-                )
-                all_files.extend(subdir_files)
+                subdir_items = enter(item.get('path', ''), depth + 1)
+                if subdir_items is not None:
+                    stack.append((subdir_items, depth + 1))
         
         return all_files
     
+    def _fetch_directory_listings(self, owner: str, repo: str, branch: str, path: str) -> Dict[str, List[Dict]]:
+        """
+        Fetch the listing of path and its subdirectories breadth-first.
+        
+        The directories of each level are fetched concurrently (up to
+        DIRECTORY_FETCH_WORKERS requests), overlapping their network round trips.
+        
+        Returns:
+            Dictionary mapping each fetched directory path to its items, down to
+            MAX_RECURSION_DEPTH levels; each directory is fetched once
+        """
+        def fetch(dir_path):
+            return self.fetch_directory_contents(owner, repo, branch, dir_path)
+        
+        listings = {}
+        frontier = [path]
+        depth = 0
+        with ThreadPoolExecutor(max_workers=self.DIRECTORY_FETCH_WORKERS) as executor:
+            while frontier and depth < self.MAX_RECURSION_DEPTH:
+                pending = list(dict.fromkeys(p for p in frontier if p not in listings))
+                next_frontier = []
+                # map() yields in submission order, so the walk stays deterministic
+                for dir_path, contents in zip(pending, executor.map(fetch, pending)):
+                    listings[dir_path] = contents
+                    next_frontier.extend(
+                        item.get('path', '') for item in contents if item.get('type') == 'dir'
+                    )
+                frontier = next_frontier
+                depth += 1
+        return listings
+    
     def parse_frontmatter(self, content: str) -> Tuple[Dict, str]:
         """
         Parse YAML frontmatter from template content.
@@ -187,18 +334,26 @@ class GitHubSyncService:
         remaining_content = content
         
         # Check if content starts with frontmatter delimiter
-        if content.strip().startswith('---'):
-            lines = content.strip().split('\n')
-            # Find the closing delimiter
-            end_index = -1
-            for i, line in enumerate(lines[1:], start=1):
-                if line.strip() == '---':
-                    end_index = i
+        text = content.strip()
+        if text.startswith('---'):
+            # Find the closing delimiter by walking lines with find(), so only the
+            # frontmatter is scanned and the body is sliced rather than split and rejoined
+            body_start = text.find('\n') + 1  # 0 when the opening delimiter is the only line
+            closing_start = closing_end = -1
+            line_start = body_start
+            while body_start:
+                newline = text.find('\n', line_start)
+                line_end = newline if newline != -1 else len(text)
+                if text[line_start:line_end].strip() == '---':
+                    closing_start, closing_end = line_start, line_end
                     break
+                if newline == -1:
+                    break
+                line_start = newline + 1
             
-            if end_index > 0:
+            if closing_start > 0:
                 # Extract and parse the frontmatter
-                frontmatter_text = '\n'.join(lines[1:end_index])
+                frontmatter_text = text[body_start:max(body_start, closing_start - 1)]
                 try:
                     frontmatter = yaml.safe_load(frontmatter_text) or {}
                 except yaml.YAMLError as e:
@@ -208,7 +363,7 @@ class GitHubSyncService:
                     frontmatter = {}
                 
                 # Get the remaining content after frontmatter
-                remaining_content = '\n'.join(lines[end_index + 1:]).strip()
+                remaining_content = text[closing_end + 1:].strip()
         
         return frontmatter, remaining_content
     
@@ -231,14 +386,15 @@ class GitHubSyncService:
         Returns:
             List of detected agent role identifiers
         """
-        valid_roles = [role[0] for role in settings.BMAD_AGENT_ROLES]
+        valid_roles = VALID_AGENT_ROLES
         frontmatter, _ = self.parse_frontmatter(content)
         
         # 1. Check for 'roles' field (list of roles)
         if 'roles' in frontmatter:
             roles = frontmatter['roles']
             if isinstance(roles, list):
-                valid_detected = [r for r in roles if r in valid_roles]
+                # Drop repeated roles, keeping first-listed order (dict.fromkeys is O(n))
+                valid_detected = list(dict.fromkeys(r for r in roles if r in valid_roles))
                 if valid_detected:
                     return valid_detected
                 # If 'roles' was explicitly set but all values were invalid,
@@ -246,7 +402,7 @@ class GitHubSyncService:
                 import logging
                 logging.warning(
                     f"Template '{filename}' has 'roles' field with no valid roles: {roles}. "
-                    f"Valid roles are: {valid_roles}"
+                    f"Valid roles are: {list(valid_roles)}"
                 )
             elif isinstance(roles, str) and roles in valid_roles:
                 return [roles]
@@ -278,7 +434,7 @@ class GitHubSyncService:
             Detected agent role identifier (primary role)
         """
         # Valid roles from settings
-        valid_roles = [role[0] for role in settings.BMAD_AGENT_ROLES]
+        valid_roles = VALID_AGENT_ROLES
         
         # 1. Check frontmatter first (preferred method)
         frontmatter, _ = self.parse_frontmatter(content)
@@ -297,42 +453,20 @@ class GitHubSyncService:
         if frontmatter.get('role') in valid_roles:
             return frontmatter['role']
         
-        content_lower = content.lower()
-        filename_lower = filename.lower()
-        
         # 2. Check filename patterns
-        if 'orchestrator' in filename_lower:
-            return 'orchestrator'
-        if 'analyst' in filename_lower:
-            return 'analyst'
-        if 'pm' in filename_lower or 'project_manager' in filename_lower:
-            return 'pm'
-        if 'architect' in filename_lower:
-            return 'architect'
-        if 'scrum' in filename_lower:
-            return 'scrum_master'
-        if 'developer' in filename_lower or 'dev' in filename_lower:
-            return 'developer'
-        if 'qa' in filename_lower or 'test' in filename_lower or 'quality' in filename_lower:
-            return 'qa'
-        
-        # 3. Check content for role indicators
-        if '## Your Role' in content:
-            role_section = content.split('## Your Role')[1].split('##')[0].lower()
-            if 'orchestrator' in role_section:
-                return 'orchestrator'
-            if 'analyst' in role_section:
-                return 'analyst'
-            if 'project manager' in role_section:
-                return 'pm'
-            if 'architect' in role_section:
-                return 'architect'
-            if 'scrum master' in role_section:
-                return 'scrum_master'
-            if 'developer' in role_section:
-                return 'developer'
-            if 'qa engineer' in role_section or 'quality assurance' in role_section:
-                return 'qa'
+        role = _match_keyword_rules(filename.lower(), FILENAME_ROLE_RULES)
+        if role:
+            return role
+        
+        # 3. Check content for role indicators, between '## Your Role' and the next heading
+        role_start = content.find('## Your Role')
+        if role_start != -1:
+            role_start += len('## Your Role')
+            role_end = content.find('##', role_start)
+            role_section = content[role_start:role_end if role_end != -1 else len(content)].lower()
+            role = _match_keyword_rules(role_section, ROLE_SECTION_RULES)
+            if role:
+                return role
         
         # 4. Default to developer if no role detected
         return 'developer'
@@ -356,34 +490,27 @@ class GitHubSyncService:
             Detected workflow phase identifier
         """
         # Valid phases from settings
-        valid_phases = [phase[0] for phase in settings.BMAD_WORKFLOW_PHASES]
+        valid_phases = VALID_WORKFLOW_PHASES
         
         # 1. Check frontmatter first (preferred method)
         frontmatter, _ = self.parse_frontmatter(content)
         if frontmatter.get('workflow_phase') in valid_phases:
             return frontmatter['workflow_phase']
         
-        filename_lower = filename.lower()
-        content_lower = content.lower()
-        
         # 2. Check filename patterns
-        if 'planning' in filename_lower or 'plan' in filename_lower:
-            return 'planning'
-        if 'development' in filename_lower or 'dev' in filename_lower or 'sprint' in filename_lower:
-            return 'development'
+        phase = _match_keyword_rules(filename.lower(), FILENAME_PHASE_RULES)
+        if phase:
+            return phase
         
         # 3. Check content for phase indicators
-        if 'planning phase' in content_lower:
-            return 'planning'
-        if 'development phase' in content_lower:
-            return 'development'
+        content_lower = content.lower()
+        phase = _match_keyword_rules(content_lower, CONTENT_PHASE_RULES)
+        if phase:
+            return phase
         
         # 4. Check for typical planning vs development content
-        planning_keywords = ['requirements', 'analysis', 'estimate', 'roadmap', 'backlog']
-        development_keywords = ['implementation', 'code', 'feature', 'refactor', 'testing']
-        
-        planning_count = sum(1 for kw in planning_keywords if kw in content_lower)
-        development_count = sum(1 for kw in development_keywords if kw in content_lower)
+        planning_count = sum(kw in content_lower for kw in PLANNING_CONTENT_KEYWORDS)
+        development_count = sum(kw in content_lower for kw in DEVELOPMENT_CONTENT_KEYWORDS)
         
         if planning_count > development_count:
             return 'planning'
@@ -410,18 +537,24 @@ class GitHubSyncService:
         if frontmatter.get('description'):
             return frontmatter['description']
         
-        # 2. Fallback to extracting from content
-        lines = remaining_content.strip().split('\n')
+        # 2. Fallback to extracting from content. Walk lines with find() so only the
+        # text before the first heading (or the third line) is read, not the whole document
         description_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith('##') or line.startswith('#'):
+        start = 0
+        while len(description_lines) < 3:
+            newline = remaining_content.find('\n', start)
+            line_end = newline if newline != -1 else len(remaining_content)
+            line = remaining_content[start:line_end].strip()
+            # '#' also covers '##' and deeper headings
+            if line.startswith('#'):
                 break
             if line:
                 description_lines.append(line)
+            if newline == -1:
+                break
+            start = newline + 1
         
-        return ' '.join(description_lines[:3]) if description_lines else ''
+        return ' '.join(description_lines)
     
     def sync_templates(self, owner: str, repo: str, branch: str, path: str) -> Dict:
         """
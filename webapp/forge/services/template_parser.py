@@ -3,9 +3,35 @@ Template parsing service for extracting variables and metadata.
 """
 
 import re
+from functools import lru_cache
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 
+try:
+    # Optional: pip install pyahocorasick
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+# Sentinel for values missing from a substitution mapping
+_MISSING = object()
+
+
+def _build_section_automaton(section_names: Dict[str, str]):
+    """
+    Build an Aho-Corasick automaton over lowercased section headings.
+    
+    Returns None when pyahocorasick is not installed.
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for name, section in section_names.items():
+        automaton.add_word(name, section)
+    automaton.make_automaton()
+    return automaton
+
 
 @dataclass
 class TemplateVariable:
@@ -25,27 +51,53 @@ class TemplateParser:
     """
     
     # Regex patterns for variable detection
-    DOUBLE_BRACE_PATTERN = r'\{\{(\w+(?::[^}]+)?)\}\}'
-    SINGLE_BRACKET_PATTERN = r'\[(\w+(?::[^\]]+)?)\]'
+    # Both syntaxes in one alternation; the group name doubles as the syntax label
+    VARIABLE_PATTERN = re.compile(
+        r'\{\{(?P<double_brace>\w+(?::[^}]+)?)\}\}'
+        r'|\[(?P<single_bracket>\w+(?::[^\]]+)?)\]'
+    )
+    SIMPLE_VARIABLE_PATTERN = re.compile(r'\{\{(\w+)\}\}|\[(\w+)\]')
+    # Placeholders including the {{VAR:default}} form, with the default captured
+    VARIABLE_NAME_PATTERN = re.compile(
+        r'\{\{(?P<name>\w+)(?::(?P<default>[^}]*))?\}\}|\[(?P<bracket>\w+)\]'
+    )
     
-    # BMAD section patterns
-    REQUIRED_SECTIONS = [
+    # BMAD section patterns, in their canonical document order
+    REQUIRED_SECTIONS = (
         '## Your Role',
         '## Input',
         '## Output Requirements',
-    ]
+    )
+    # Set form for one-step missing-section differences
+    REQUIRED_SECTION_SET = frozenset(REQUIRED_SECTIONS)
     
-    OPTIONAL_SECTIONS = [
+    OPTIONAL_SECTIONS = (
         '## Context',
         '## Constraints',
         '## Examples',
         '## Step-by-Step Instructions',
         '## Success Criteria',
         '## Notes',
-    ]
+    )
     
     ALL_SECTIONS = REQUIRED_SECTIONS + OPTIONAL_SECTIONS
     
+    # Lowercased section heading -> canonical heading, matched in one alternation.
+    # re.ASCII keeps case-insensitive matching to the folds .lower() undoes, so
+    # headings like '## ınput' or '## Conſtraints' never reach the lookup
+    SECTION_NAMES = {section.lower(): section for section in ALL_SECTIONS}
+    SECTION_PATTERN = re.compile(
+        '|'.join(re.escape(name) for name in SECTION_NAMES), re.IGNORECASE | re.ASCII
+    )
+    # Optional Aho-Corasick matcher over the same headings (None without pyahocorasick)
+    SECTION_AUTOMATON = _build_section_automaton(SECTION_NAMES)
+    REQUIRED_SECTION_PATTERN = re.compile(
+        '|'.join(re.escape(section) for section in REQUIRED_SECTIONS), re.IGNORECASE | re.ASCII
+    )
+    
+    # Templates at least this long are validated without caching, bounding cache memory
+    MAX_CACHED_CONTENT_LENGTH = 64_000
+    
     @classmethod
     def extract_variables(cls, content: str) -> List[TemplateVariable]:
         """
@@ -58,29 +110,32 @@ class TemplateParser:
             List of TemplateVariable objects
         """
         variables = []
+        seen = set()
         
-        # Find double brace variables: {{VAR_NAME}} or {{VAR_NAME:default}}
-        for match in re.finditer(cls.DOUBLE_BRACE_PATTERN, content):
-            var = TemplateVariable(
-                name=match.group(1).split(':')[0],
-                syntax='double_brace',
-                start_pos=match.start(),
-                end_pos=match.end(),
-                default_value=match.group(1).split(':')[1] if ':' in match.group(1) else None
-            )
-            if var not in variables:
-                variables.append(var)
-        
-        # Find single bracket variables: [VAR_NAME]
-        for match in re.finditer(cls.SINGLE_BRACKET_PATTERN, content):
+        # Single pass over content for {{VAR_NAME}}, {{VAR_NAME:default}} and [VAR_NAME]
+        for match in cls.VARIABLE_PATTERN.finditer(content):
+            syntax = match.lastgroup
+            if syntax == 'double_brace':
+                name, _, default = match.group(syntax).partition(':')
+                default_value = default or None
+            else:
+                name = match.group(syntax)
+                default_value = None
+            
+            # Keep the first occurrence of each variable per syntax
+            key = (name, syntax)
+            if key in seen:
+                continue
+            seen.add(key)
+            
             var = TemplateVariable(
-                name=match.group(1),
-                syntax='single_bracket',
+                name=name,
+                syntax=syntax,
                 start_pos=match.start(),
                 end_pos=match.end(),
+                default_value=default_value,
             )
-            if var not in variables:
-                variables.append(var)
+            variables.append(var)
         
         return variables
     
@@ -93,14 +148,14 @@ class TemplateParser:
             content: Template content string
             
         Returns:
-            List of variable names
+            Sorted list of variable names ({{VAR:default}} yields VAR)
         """
-        pattern = r'\{\{(\w+)\}\}|\[(\w+)\]'
-        matches = re.findall(pattern, content)
-        variables = set()
-        for match in matches:
-            variables.add(match[0] if match[0] else match[1])
-        return sorted(list(variables))
+        # findall yields (name, default, bracket) tuples without building Match objects
+        variables = {
+            name or bracket
+            for name, _, bracket in cls.VARIABLE_NAME_PATTERN.findall(content)
+        }
+        return sorted(variables)
     
     @classmethod
     def detect_sections(cls, content: str) -> Dict[str, Tuple[int, int]]:
@@ -114,13 +169,16 @@ class TemplateParser:
             Dictionary mapping section names to their (start, end) positions
         """
         sections = {}
-        content_lower = content.lower()
         
-        for section in cls.ALL_SECTIONS:
-            section_lower = section.lower()
-            pos = content_lower.find(section_lower)
-            if pos != -1:
-                sections[section] = (pos, pos + len(section))
+        # Lowercasing only preserves offsets for ASCII, so other content uses the regex
+        if cls.SECTION_AUTOMATON is not None and content.isascii():
+            for end, section in cls.SECTION_AUTOMATON.iter(content.lower()):
+                sections.setdefault(section, (end - len(section) + 1, end + 1))
+            return sections
+        
+        # Record the first occurrence of each section, in document order
+        for match in cls.SECTION_PATTERN.finditer(content):
+            sections.setdefault(cls.SECTION_NAMES[match.group(0).lower()], (match.start(), match.end()))
         
         return sections
     
@@ -135,15 +193,32 @@ class TemplateParser:
         Returns:
             Tuple of (is_valid, list of missing sections)
         """
-        sections = cls.detect_sections(content)
-        missing = []
-        
-        for section in cls.REQUIRED_SECTIONS:
-            if section not in sections:
-                missing.append(section)
+        # Only the required headings matter here, so skip the optional ones
+        found = {
+            cls.SECTION_NAMES[match.group(0).lower()]
+            for match in cls.REQUIRED_SECTION_PATTERN.finditer(content)
+        }
+        missing = cls.missing_required_sections(found)
         
         return len(missing) == 0, missing
     
+    @classmethod
+    def missing_required_sections(cls, found) -> List[str]:
+        """
+        Return the required sections absent from found, in canonical order.
+        
+        Args:
+            found: Collection of canonical section headings present, e.g. the
+                result of detect_sections
+            
+        Returns:
+            List of missing required section headings
+        """
+        missing = cls.REQUIRED_SECTION_SET.difference(found)
+        if not missing:
+            return []
+        return [section for section in cls.REQUIRED_SECTIONS if section in missing]
+    
     @classmethod
     def validate_template(cls, content: str) -> Dict:
         """
@@ -155,46 +230,66 @@ class TemplateParser:
         Returns:
             Dictionary with validation results
         """
-        result = {
-            'is_valid': True,
-            'errors': [],
-            'warnings': [],
-            'variables': [],
-            'sections': [],
+        # Results are cached per content as tuples; build fresh containers for callers
+        if len(content) >= cls.MAX_CACHED_CONTENT_LENGTH:
+            result = cls._build_validation(content)
+        else:
+            result = cls._validate_template_cached(content)
+        is_valid, errors, warnings, variables, sections = result
+        return {
+            'is_valid': is_valid,
+            'errors': list(errors),
+            'warnings': list(warnings),
+            'variables': [
+                {'name': name, 'syntax': syntax, 'has_default': has_default}
+                for name, syntax, has_default in variables
+            ],
+            'sections': list(sections),
         }
+    
+    @classmethod
+    @lru_cache(maxsize=512)
+    def _validate_template_cached(cls, content: str) -> Tuple:
+        """Validate template content; memoized on the content string."""
+        return cls._build_validation(content)
+    
+    @classmethod
+    def _build_validation(cls, content: str) -> Tuple:
+        """
+        Validate template content.
+        
+        Returns:
+            Tuple of (is_valid, errors, warnings, variables, sections), where
+            variables holds (name, syntax, has_default) tuples
+        """
+        errors = []
+        warnings = []
         
-        # Check required sections
-        is_valid, missing = cls.check_required_sections(content)
-        if not is_valid:
-            result['is_valid'] = False
-            result['errors'].append(f"Missing required sections: {', '.join(missing)}")
+        # Detect present sections once and derive the required-section check from them
+        sections = cls.detect_sections(content)
+        missing = cls.missing_required_sections(sections)
+        if missing:
+            errors.append(f"Missing required sections: {', '.join(missing)}")
         
         # Extract variables
-        variables = cls.extract_variables(content)
-        result['variables'] = [
-            {
-                'name': v.name,
-                'syntax': v.syntax,
-                'has_default': v.default_value is not None,
-            }
-            for v in variables
-        ]
+        variables = tuple(
+            (v.name, v.syntax, v.default_value is not None)
+            for v in cls.extract_variables(content)
+        )
         
         # Check for potential issues
         if not variables:
-            result['warnings'].append("No variables found in template")
+            warnings.append("No variables found in template")
         
-        # Detect present sections
-        sections = cls.detect_sections(content)
-        result['sections'] = list(sections.keys())
-        
-        return result
+        return not missing, tuple(errors), tuple(warnings), variables, tuple(sections)
     
     @classmethod
     def substitute_variables(cls, content: str, values: Dict[str, str]) -> str:
         """
         Substitute variables in template content with provided values.
         
+        {{VAR:default}} placeholders without a value fall back to their default.
+        
         Args:
             content: Template content string
             values: Dictionary mapping variable names to replacement values
@@ -202,15 +297,23 @@ class TemplateParser:
         Returns:
             Content with variables substituted
         """
-        result = content
+        # Substring checks are cheaper than a regex scan when there is nothing to replace
+        if '{{' not in content and '[' not in content:
+            return content
         
-        for var_name, value in values.items():
-            # Replace double brace syntax
-            result = result.replace('{{' + var_name + '}}', str(value))
-            # Replace single bracket syntax
-            result = result.replace('[' + var_name + ']', str(value))
+        def replace(match):
+            # One dict lookup per placeholder; None is a valid value, hence the sentinel
+            value = values.get(match.group('name') or match.group('bracket'), _MISSING)
+            if value is not _MISSING:
+                return str(value)
+            default = match.group('default')
+            if default is not None:
+                return default
+            # Leave unknown variables in place so they are reported as unreplaced
+            return match.group(0)
         
-        return result
+        # One pass over content, whatever the number of values
+        return cls.VARIABLE_NAME_PATTERN.sub(replace, content)
     
     @classmethod
     def find_unreplaced_variables(cls, content: str) -> List[str]:
@@ -223,10 +326,8 @@ class TemplateParser:
         Returns:
             List of unreplaced variable names
         """
-        variables = cls.extract_variables_simple(content)
-        # Check if any variables remain in content
-        unreplaced = []
-        for var in variables:
-            if '{{' + var + '}}' in content or '[' + var + ']' in content:
-                unreplaced.append(var)
-        return unreplaced
+        # Every placeholder match is by definition still present in content
+        return sorted({
+            double_brace or bracket
+            for double_brace, bracket in cls.SIMPLE_VARIABLE_PATTERN.findall(content)
+        })
@@ -5,16 +5,28 @@ Views for BMAD Forge application.
 import json
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import ListView, DetailView, FormView, TemplateView, View
-from django.http import JsonResponse, FileResponse, HttpResponse
+from django.http import JsonResponse, FileResponse, HttpResponse, StreamingHttpResponse
 from django.contrib import messages
 from django.conf import settings
-from django.db import models
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 from django.views.decorators.http import require_http_methods
 from .models import Template, GeneratedPrompt
 from .forms import DynamicPromptForm, TemplateFilterForm, GitHubSyncForm
 from .services import GitHubSyncService, BMADValidator, DocumentGenerator
 
 
+# Role and phase choices are fixed at startup, so resolve them from settings once
+AGENT_ROLES = tuple(settings.BMAD_AGENT_ROLES)
+WORKFLOW_PHASES = tuple(settings.BMAD_WORKFLOW_PHASES)
+
+# Columns rendered by the template list/select pages; skips the large content column
+TEMPLATE_LIST_FIELDS = (
+    'id', 'title', 'description', 'agent_role', 'agent_roles', 'workflow_phase', 'variables',
+)
+
+
 class DashboardView(TemplateView):
     """
     Dashboard view showing template count and recent generated prompts.
@@ -24,40 +36,39 @@ class DashboardView(TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['total_templates'] = Template.objects.filter(is_active=True).count()
-        context['templates_by_role'] = self._get_templates_by_role()
-        context['templates_by_phase'] = self._get_templates_by_phase()
+        total, by_role, by_phase = self._get_template_counts()
+        context['total_templates'] = total
+        context['templates_by_role'] = by_role
+        context['templates_by_phase'] = by_phase
         context['recent_prompts'] = GeneratedPrompt.objects.select_related('template')[:5]
         context['recent_templates'] = Template.objects.filter(is_active=True).order_by('-created_at')[:5]
         return context
     
-    def _get_templates_by_role(self):
-        """Get template counts grouped by agent role.
+    def _get_template_counts(self):
+        """Get the active template total and counts by agent role and workflow phase.
         
-        Counts templates for each role, considering that templates can have
-        multiple roles stored in the agent_roles JSONField.
+        Fetches only the role and phase columns in a single query. Templates can
+        have multiple roles stored in the agent_roles JSONField, so role counts
+        mirror Template.get_roles_list() and are tallied in Python.
         """
         from collections import Counter
         
-        templates = Template.objects.filter(is_active=True)
+        rows = (
+            Template.objects.filter(is_active=True)
+            .order_by()
+            .values_list('agent_role', 'agent_roles', 'workflow_phase')
+        )
+        total = 0
         role_counts = Counter()
+        phase_counts = Counter()
         
-        for template in templates:
-            # Use the get_roles_list() method which handles both agent_role 
-            # and agent_roles fields
-            for role in template.get_roles_list():
-                role_counts[role] += 1
+        for agent_role, agent_roles, workflow_phase in rows:
+            total += 1
+            roles = agent_roles or ([agent_role] if agent_role else [])
+            role_counts.update(roles)
+            phase_counts[workflow_phase] += 1
         
-        return dict(role_counts)
-    
-    def _get_templates_by_phase(self):
-        """Get template counts grouped by workflow phase."""
-        return dict(
-            Template.objects.filter(is_active=True)
-            .values('workflow_phase')
-            .annotate(count=models.Count('id'))
-            .values_list('workflow_phase', 'count')
-        )
+        return total, dict(role_counts), dict(phase_counts)
 
 
 class TemplateListView(ListView):
@@ -69,9 +80,11 @@ class TemplateListView(ListView):
     template_name = 'forge/template_list.html'
     context_object_name = 'templates'
     paginate_by = 12
+    agent_roles = AGENT_ROLES
+    workflow_phases = WORKFLOW_PHASES
     
     def get_queryset(self):
-        queryset = Template.objects.filter(is_active=True)
+        queryset = Template.objects.filter(is_active=True).only(*TEMPLATE_LIST_FIELDS)
         
         # Apply filters
         agent_role = self.request.GET.get('agent_role')
@@ -81,12 +94,8 @@ class TemplateListView(ListView):
         # Filter by workflow phase using the custom manager
         queryset = Template.objects.filter_by_workflow(queryset, workflow_phase)
         
-        if search:
-            queryset = queryset.filter(
-                models.Q(title__icontains=search) |
-                models.Q(description__icontains=search) |
-                models.Q(content__icontains=search)
-            )
+        # Search title, description and content using the custom manager
+        queryset = Template.objects.search(queryset, search)
         
         # Filter by role - handles multi-role templates using the custom manager
         queryset = Template.objects.filter_by_role(queryset, agent_role)
@@ -96,8 +105,8 @@ class TemplateListView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['filter_form'] = TemplateFilterForm(self.request.GET)
-        context['agent_roles'] = settings.BMAD_AGENT_ROLES
-        context['workflow_phases'] = settings.BMAD_WORKFLOW_PHASES
+        context['agent_roles'] = self.agent_roles
+        context['workflow_phases'] = self.workflow_phases
         return context
 
 
@@ -138,23 +147,9 @@ class PromptFormView(FormView):
         return context
     
     def form_valid(self, form):
-        template = self.get_template()
-        
-        # Generate the prompt
-        final_output = form.generate_output()
-        
-        # Validate the generated prompt
-        validation_report = BMADValidator.validate(final_output)
-        
-        # Create the GeneratedPrompt record
-        generated_prompt = GeneratedPrompt.objects.create(
-            template=template,
-            input_data=form.cleaned_data,
-            final_output=final_output,
-            is_valid=validation_report.is_valid,
-            validation_notes=validation_report.notes,
-            missing_variables=validation_report.unreplaced_variables,
-        )
+        # Generate and validate the prompt, then create the GeneratedPrompt record
+        generated_prompt, validation_report = GeneratedPrompt.objects.build_from_form(form)
+        generated_prompt.save()
         
         # Add messages
         if validation_report.is_valid:
@@ -181,13 +176,38 @@ class PromptResultView(DetailView):
         context = super().get_context_data(**kwargs)
         context['validation_report'] = self.object.get_validation_status()
         
-        # Get validation details
-        validator_report = BMADValidator.validate(self.object.final_output)
-        context['validation_details'] = validator_report
+        # Use the report stored at generation time; older prompts are validated on demand
+        context['validation_details'] = (
+            self.object.validation_report
+            or BMADValidator.validate(self.object.final_output).get_summary()
+        )
         
         return context
 
 
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that caches the total object count for a short period.
+    
+    Avoids issuing a COUNT(*) query on every page of large listings.
+    """
+    
+    COUNT_CACHE_TIMEOUT = 10  # seconds
+    
+    def __init__(self, *args, count_cache_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_cache_key = count_cache_key
+    
+    @cached_property
+    def count(self):
+        """Return the object count, served from the cache when a key is set."""
+        if not self.count_cache_key:
+            return super().count
+        return cache.get_or_set(
+            self.count_cache_key, self.object_list.count, self.COUNT_CACHE_TIMEOUT
+        )
+
+
 class PromptHistoryView(ListView):
     """
     View showing history of generated prompts.
@@ -197,9 +217,14 @@ class PromptHistoryView(ListView):
     template_name = 'forge/prompt_history.html'
     context_object_name = 'prompts'
     paginate_by = 20
+    paginator_class = CachedCountPaginator
     
     def get_queryset(self):
-        queryset = GeneratedPrompt.objects.select_related('template')
+        # Skip the large final_output/input_data columns; the listing doesn't render them
+        queryset = GeneratedPrompt.objects.select_related('template').only(
+            'id', 'template', 'is_valid', 'created_at',
+            'template__title', 'template__agent_role', 'template__workflow_phase',
+        )
         
         # Filter by validation status
         status = self.request.GET.get('status')
@@ -209,6 +234,14 @@ class PromptHistoryView(ListView):
             queryset = queryset.filter(is_valid=False)
         
         return queryset
+    
+    def get_paginator(self, queryset, per_page, **kwargs):
+        status = self.request.GET.get('status')
+        if status not in ('valid', 'invalid'):
+            status = 'all'
+        return super().get_paginator(
+            queryset, per_page, count_cache_key=f'prompt_history_count:{status}', **kwargs
+        )
 
 
 class GitHubSyncView(FormView):
@@ -274,14 +307,23 @@ def manual_sync(request):
     return redirect('forge:template_list')
 
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_encoded_chunks(text, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """Yield UTF-8 encoded slices of text so it is never encoded in one piece."""
+    for start in range(0, len(text), chunk_size):
+        yield text[start:start + chunk_size].encode('utf-8')
+
+
 def download_prompt(request, pk):
     """
     Download generated prompt as a Markdown file.
     """
-    prompt = get_object_or_404(GeneratedPrompt, pk=pk)
+    prompt = get_object_or_404(GeneratedPrompt.objects.only('final_output', 'created_at'), pk=pk)
     
-    response = HttpResponse(
-        prompt.final_output,
+    response = StreamingHttpResponse(
+        _iter_encoded_chunks(prompt.final_output),
         content_type='text/markdown; charset=utf-8'
     )
     filename = f"bmad_prompt_{pk}_{prompt.created_at.strftime('%Y%m%d_%H%M%S')}.md"
@@ -342,9 +384,11 @@ class GenerateDocumentSelectView(ListView):
     template_name = 'forge/generate_document_select.html'
     context_object_name = 'templates'
     paginate_by = 12
+    agent_roles = AGENT_ROLES
+    workflow_phases = WORKFLOW_PHASES
     
     def get_queryset(self):
-        queryset = Template.objects.filter(is_active=True)
+        queryset = Template.objects.filter(is_active=True).only(*TEMPLATE_LIST_FIELDS)
         
         # Apply filters
         agent_role = self.request.GET.get('agent_role')
@@ -354,12 +398,8 @@ class GenerateDocumentSelectView(ListView):
         # Filter by workflow phase using the custom manager
         queryset = Template.objects.filter_by_workflow(queryset, workflow_phase)
         
-        if search:
-            queryset = queryset.filter(
-                models.Q(title__icontains=search) |
-                models.Q(description__icontains=search) |
-                models.Q(content__icontains=search)
-            )
+        # Search title, description and content using the custom manager
+        queryset = Template.objects.search(queryset, search)
         
         # Filter by role - handles multi-role templates using the custom manager
         queryset = Template.objects.filter_by_role(queryset, agent_role)
@@ -369,8 +409,8 @@ class GenerateDocumentSelectView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['filter_form'] = TemplateFilterForm(self.request.GET)
-        context['agent_roles'] = settings.BMAD_AGENT_ROLES
-        context['workflow_phases'] = settings.BMAD_WORKFLOW_PHASES
+        context['agent_roles'] = self.agent_roles
+        context['workflow_phases'] = self.workflow_phases
         return context
 
 
@@ -391,7 +431,7 @@ class GenerateDocumentWizardView(TemplateView):
         template = self.get_template_object()
         
         # Get wizard steps from DocumentGenerator
-        wizard_steps = DocumentGenerator.get_wizard_steps(template.content)
+        wizard_steps = DocumentGenerator.get_wizard_steps(template.content, template.get_sections())
         
         # Get current step from query param
         current_step = int(self.request.GET.get('step', 1))
@@ -413,7 +453,8 @@ class GenerateDocumentWizardView(TemplateView):
     
     def post(self, request, *args, **kwargs):
         template = self.get_template_object()
-        wizard_steps = DocumentGenerator.get_wizard_steps(template.content)
+        sections = template.get_sections()
+        total_steps = len(sections)
         
         current_step = int(request.POST.get('current_step', 1))
         action = request.POST.get('action', 'next')
@@ -422,9 +463,11 @@ class GenerateDocumentWizardView(TemplateView):
         session_key = f'doc_gen_{template.id}'
         section_data = request.session.get(session_key, {})
         
-        # Get current section name
-        if wizard_steps and 1 <= current_step <= len(wizard_steps):
-            current_section = wizard_steps[current_step - 1]
+        # Get current section name; only the posted step is built
+        if 1 <= current_step <= total_steps:
+            current_section = next(
+                DocumentGenerator.iter_wizard_steps(template.content, sections, start=current_step)
+            )
             section_name = current_section['section_name']
             
             # Store the section content
@@ -441,15 +484,15 @@ class GenerateDocumentWizardView(TemplateView):
         # Handle navigation
         if action == 'prev' and current_step > 1:
             return redirect(f"{request.path}?step={current_step - 1}")
-        elif action == 'next' and current_step < len(wizard_steps):
+        elif action == 'next' and current_step < total_steps:
             return redirect(f"{request.path}?step={current_step + 1}")
         elif action == 'generate':
             # Generate the final document
-            return self._generate_document(request, template, section_data, wizard_steps)
+            return self._generate_document(request, template, section_data)
         
         return redirect(f"{request.path}?step={current_step}")
     
-    def _generate_document(self, request, template, section_data, wizard_steps):
+    def _generate_document(self, request, template, section_data):
         """Generate the final document and create a GeneratedPrompt record."""
         # Separate section content from variable data
         variable_data = {}
@@ -466,7 +509,8 @@ class GenerateDocumentWizardView(TemplateView):
         final_output, validations = DocumentGenerator.generate_document(
             template.content,
             section_content,
-            variable_data
+            variable_data,
+            sections=template.get_sections(),
         )
         
         # Validate for BMAD compliance
@@ -486,6 +530,7 @@ class GenerateDocumentWizardView(TemplateView):
             is_valid=compliance_report['is_compliant'] and bmad_report.is_valid,
             validation_notes=compliance_report['warnings'] + compliance_report['issues'],
             missing_variables=compliance_report['unreplaced_variables'],
+            validation_report=bmad_report.get_summary(),
         )
         
         # Clear session data
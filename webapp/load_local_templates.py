@@ -2,8 +2,14 @@
 """
 Script to load templates from local directories into the database.
 """
+import dbm
+import hashlib
 import os
+import shelve
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
 import django
 
 # Setup Django
@@ -11,6 +17,9 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bmad_forge.settings')
 django.setup()
 
+from django.db import transaction
+from django.utils import timezone
+
 from forge.models import Template
 from forge.services.template_parser import TemplateParser
 from forge.services.github_sync import GitHubSyncService
@@ -21,79 +30,285 @@ TEMPLATE_DIRECTORIES = [
     'forge/templates/templates',
 ]
 
+# Template fields set from parsed files on create and update
+TEMPLATE_FIELDS = [
+    'content',
+    'agent_role',
+    'agent_roles',
+    'workflow_phase',
+    'description',
+    'variables',
+    'remote_path',
+    'is_active',
+]
 
-def load_templates_from_directory(templates_dir, parser, sync_service):
+# Rows per INSERT/UPDATE statement
+BULK_BATCH_SIZE = 500
+
+# Minimum number of files before parsing is spread over worker processes
+PARALLEL_PARSE_MIN_FILES = 50
+
+# On-disk cache of parsed fields, keyed by file name and content hash
+PARSE_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'bmad_forge', 'template_parse')
+# Bump when parsing or role/phase detection changes, so stale entries are ignored
+PARSE_CACHE_VERSION = 1
+
+
+def parse_template_content(content, filename, parser, sync_service):
     """
-    Load templates from a single directory.
+    Derive the parsed fields of a template from its file name and content.
     
     Args:
-        templates_dir: Path to the directory containing templates
+        content: Template file content
+        filename: Template file name (role/phase detection also uses it)
         parser: TemplateParser instance
         sync_service: GitHubSyncService instance
         
     Returns:
-        Tuple of (created_count, updated_count)
+        Dictionary of agent_role, agent_roles, workflow_phase, description and variables
+    """
+    return {
+        'agent_role': sync_service.detect_agent_role(content, filename),
+        'agent_roles': sync_service.detect_agent_roles(content, filename),
+        'workflow_phase': sync_service.detect_workflow_phase(content, filename),
+        'description': sync_service.parse_template_description(content) or '',
+        'variables': parser.extract_variables_simple(content),
+    }
+
+
+def parse_one(filepath, content, parser, sync_service):
+    """
+    Parse one template's content, capturing any error instead of raising.
+    
+    Module-level so it can run in ProcessPoolExecutor workers.
+    
+    Returns:
+        Tuple of (parsed fields dictionary or None, error message or None)
+    """
+    try:
+        return parse_template_content(content, os.path.basename(filepath), parser, sync_service), None
+    except Exception as e:
+        return None, str(e)
+
+
+def build_template_data(filepath, content, parsed_fields):
+    """Combine a file's path, content and parsed fields into Template field values."""
+    filename = os.path.basename(filepath)
+    return {
+        'title': filename.replace('.md', '').replace('_', ' ').title(),
+        'content': content,
+        **parsed_fields,
+        'remote_path': filepath,
+        'is_active': True,
+    }
+
+
+def parse_cache_key(filename, content):
+    """Build the parse cache key for a template file name and content."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(filename.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(content.encode('utf-8'))
+    return f"{PARSE_CACHE_VERSION}:{digest.hexdigest()}"
+
+
+def open_parse_cache(path=PARSE_CACHE_PATH):
     """
-    created_count = 0
-    updated_count = 0
+    Open the on-disk parse cache.
     
+    Returns:
+        shelve.Shelf, or None if the cache cannot be opened
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return shelve.open(path)
+    except (OSError, dbm.error) as e:
+        print(f"Parse cache unavailable ({e}); parsing every template")
+        return None
+
+
+def list_template_files(templates_dir):
+    """
+    List the .md template files in a directory.
+    
+    Args:
+        templates_dir: Path to the directory containing templates
+        
+    Returns:
+        List of template file paths (empty if the directory is missing or unreadable)
+    """
     if not os.path.exists(templates_dir):
         print(f"Templates directory not found: {templates_dir}")
-        return created_count, updated_count
+        return []
     
-    # Process all .md files in the templates directory
+    # scandir reports entry types without a stat call per file
     try:
-        filenames = os.listdir(templates_dir)
+        with os.scandir(templates_dir) as entries:
+            return [
+                os.path.join(templates_dir, entry.name)
+                for entry in entries
+                if entry.name.endswith('.md') and entry.is_file()
+            ]
     except OSError as e:
         print(f"Error listing directory {templates_dir}: {e}")
-        return created_count, updated_count
+        return []
+
+
+def parse_template_files(filepaths, parser, sync_service, cache=None):
+    """
+    Parse template files, across CPU cores when there are enough of them.
     
-    for filename in filenames:
-        if not filename.endswith('.md'):
-            continue
-        
-        filepath = os.path.join(templates_dir, filename)
-        print(f"Processing: {filename}")
+    Files whose name and content are already in the cache skip parsing. Parsing
+    is CPU-bound regex work; below PARALLEL_PARSE_MIN_FILES files to parse the
+    cost of starting worker processes outweighs the gain, so they are parsed
+    in this process.
+    
+    Args:
+        filepaths: Paths of the .md template files
+        parser: TemplateParser instance
+        sync_service: GitHubSyncService instance
+        cache: Optional mapping (e.g. from open_parse_cache) of parse_cache_key
+            to parsed fields; filled in with newly parsed files
         
+    Returns:
+        List of parsed template dictionaries, in filepaths order
+    """
+    results = {}
+    pending = []
+    for filepath in filepaths:
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
                 content = f.read()
-            
-            # Parse the template
-            title = filename.replace('.md', '').replace('_', ' ').title()
-            variables = parser.extract_variables_simple(content)
-            description = sync_service.parse_template_description(content)
-            agent_role = sync_service.detect_agent_role(content, filename)
-            agent_roles = sync_service.detect_agent_roles(content, filename)
-            workflow_phase = sync_service.detect_workflow_phase(content, filename)
-            
-            # Check if template already exists
-            template, created = Template.objects.update_or_create(
-                title=title,
-                defaults={
-                    'content': content,
-                    'agent_role': agent_role,
-                    'agent_roles': agent_roles,
-                    'workflow_phase': workflow_phase,
-                    'description': description or '',
-                    'variables': variables,
-                    'remote_path': filepath,
-                    'is_active': True,
-                }
-            )
-            
-            roles_display = ', '.join(agent_roles) if agent_roles else 'auto-detected'
-            if created:
-                created_count += 1
-                print(f"  ✓ Created: {title} (roles: {roles_display})")
-            else:
-                updated_count += 1
-                print(f"  ✓ Updated: {title} (roles: {roles_display})")
-                
         except Exception as e:
-            print(f"  ✗ Error processing {filename}: {e}")
+            results[filepath] = (None, str(e))
+            continue
+        
+        key = None
+        if cache is not None:
+            key = parse_cache_key(os.path.basename(filepath), content)
+            cached = cache.get(key)
+            if cached is not None:
+                results[filepath] = (build_template_data(filepath, content, cached), None)
+                continue
+        pending.append((filepath, content, key))
     
-    return created_count, updated_count
+    parse = partial(parse_one, parser=parser, sync_service=sync_service)
+    paths = [filepath for filepath, _, _ in pending]
+    contents = [content for _, content, _ in pending]
+    if len(pending) >= PARALLEL_PARSE_MIN_FILES:
+        with ProcessPoolExecutor() as executor:
+            parsed = list(executor.map(parse, paths, contents, chunksize=8))
+    else:
+        parsed = [parse(filepath, content) for filepath, content in zip(paths, contents)]
+    
+    for (filepath, content, key), (fields, error) in zip(pending, parsed):
+        if error is not None:
+            results[filepath] = (None, error)
+            continue
+        if cache is not None:
+            cache[key] = fields
+        results[filepath] = (build_template_data(filepath, content, fields), None)
+    
+    parsed_templates = []
+    for filepath in filepaths:
+        data, error = results[filepath]
+        filename = os.path.basename(filepath)
+        print(f"Processing: {filename}")
+        if error is not None:
+            print(f"  ✗ Error processing {filename}: {error}")
+        else:
+            parsed_templates.append(data)
+    return parsed_templates
+
+
+def parse_templates_from_directory(templates_dir, parser, sync_service):
+    """
+    Parse all templates in a single directory without touching the database.
+    
+    Args:
+        templates_dir: Path to the directory containing templates
+        parser: TemplateParser instance
+        sync_service: GitHubSyncService instance
+        
+    Returns:
+        List of parsed template dictionaries (see build_template_data)
+    """
+    return parse_template_files(list_template_files(templates_dir), parser, sync_service)
+
+
+def save_templates(parsed_templates):
+    """
+    Create or update parsed templates, matched by title, with bulk queries.
+    
+    Existing templates are fetched in one query and all writes run in a single
+    transaction, instead of a SELECT plus INSERT/UPDATE per file.
+    
+    Args:
+        parsed_templates: Iterable of parsed template dictionaries; later
+            entries win when titles repeat
+        
+    Returns:
+        Tuple of (created_count, updated_count)
+    """
+    by_title = {data['title']: data for data in parsed_templates}
+    
+    existing = {}
+    duplicated = set()
+    for template in Template.objects.filter(title__in=list(by_title)):
+        if template.title in existing:
+            duplicated.add(template.title)
+        existing[template.title] = template
+    
+    to_create = []
+    to_update = []
+    now = timezone.now()
+    for title, data in by_title.items():
+        if title in duplicated:
+            print(f"  ✗ Error processing {title}: multiple templates share this title")
+            continue
+        
+        template = existing.get(title)
+        if template is None:
+            template = Template(**data)
+            to_create.append(template)
+        else:
+            for field_name in TEMPLATE_FIELDS:
+                setattr(template, field_name, data[field_name])
+            # bulk_update does not apply auto_now
+            template.last_updated = now
+            to_update.append(template)
+        # Bulk operations bypass save(), which fills in variables, sections and roles
+        template.refresh_derived_fields()
+    
+    with transaction.atomic():
+        Template.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE)
+        Template.objects.bulk_update(
+            to_update,
+            TEMPLATE_FIELDS + ['parsed_sections', 'last_updated'],
+            batch_size=BULK_BATCH_SIZE,
+        )
+    
+    for action, templates in (('Created', to_create), ('Updated', to_update)):
+        for template in templates:
+            roles_display = ', '.join(template.agent_roles) if template.agent_roles else 'auto-detected'
+            print(f"  ✓ {action}: {template.title} (roles: {roles_display})")
+    
+    return len(to_create), len(to_update)
+
+
+def load_templates_from_directory(templates_dir, parser, sync_service):
+    """
+    Load templates from a single directory.
+    
+    Args:
+        templates_dir: Path to the directory containing templates
+        parser: TemplateParser instance
+        sync_service: GitHubSyncService instance
+        
+    Returns:
+        Tuple of (created_count, updated_count)
+    """
+    return save_templates(parse_templates_from_directory(templates_dir, parser, sync_service))
 
 
 def load_templates():
@@ -101,19 +316,28 @@ def load_templates():
     base_dir = os.path.dirname(__file__)
     parser = TemplateParser()
     sync_service = GitHubSyncService()
-    total_created = 0
-    total_updated = 0
+    filepaths = []
     
     for template_dir in TEMPLATE_DIRECTORIES:
         templates_dir = os.path.join(base_dir, template_dir)
         print(f"\nLoading templates from: {template_dir}")
         print("-" * 50)
         
-        created, updated = load_templates_from_directory(
-            templates_dir, parser, sync_service
-        )
-        total_created += created
-        total_updated += updated
+        filepaths.extend(list_template_files(templates_dir))
+    
+    # Parse every directory's files together so they share one worker pool;
+    # files unchanged since the last run come from the parse cache
+    cache = open_parse_cache()
+    try:
+        parsed_templates = parse_template_files(filepaths, parser, sync_service, cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    
+    # Write every directory's templates in one batch
+    print(f"\nSaving {len(parsed_templates)} templates")
+    print("-" * 50)
+    total_created, total_updated = save_templates(parsed_templates)
     
     print(f"\n✓ Completed!")
     print(f"  Total Created: {total_created}")
@@ -3,6 +3,7 @@ Pytest configuration for BMAD Forge tests.
 """
 
 import pytest
+from django.db import transaction
 from django.test import override_settings
 
 
@@ -66,3 +67,35 @@ def mock_github_response():
             'content': 'c29tZSBjb250ZW50',  # base64 encoded "some content"
         },
     ]
+
+
+@pytest.fixture(scope='class')
+def class_db(django_db_setup, django_db_blocker):
+    """
+    Hold one transaction open for a whole test class.
+
+    Rows created inside it are shared by the class's tests, whose own
+    django_db transactions nest inside it as savepoints, and are rolled back
+    once the class finishes, like Django's TestCase.setUpTestData.
+    """
+    atomic = transaction.atomic()
+    with django_db_blocker.unblock():
+        atomic.__enter__()
+    yield
+    with django_db_blocker.unblock():
+        transaction.set_rollback(True)
+        atomic.__exit__(None, None, None)
+
+
+@pytest.fixture(scope='class')
+def dev_template(class_db, django_db_blocker):
+    """Developer template created once per test class."""
+    from forge.models import Template
+    
+    with django_db_blocker.unblock():
+        return Template.objects.create(
+            title='Test Template',
+            content='Hello {{name}}!',
+            agent_role='developer',
+            workflow_phase='development',
+        )
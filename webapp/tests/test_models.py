@@ -2,7 +2,10 @@
 Tests for BMAD Forge models.
 """
 
+import sys
+
 import pytest
+from unittest.mock import patch
 from django.utils import timezone
 from forge.models import Template, GeneratedPrompt
 
@@ -67,6 +70,12 @@ class TestTemplateModel:
         assert 'var2' in variables
         assert 'var3' in variables
     
+    def test_extract_variables_sorted_unique(self):
+        """Test repeated variables in either syntax are listed once, sorted."""
+        template = Template(content='[b] {{a}} {{b}} [a] {{b:x}}')
+        
+        assert template.extract_variables() == ['a', 'b']
+    
     def test_generate_prompt(self):
         """Test prompt generation with variable substitution."""
         template = Template.objects.create(
@@ -95,6 +104,58 @@ class TestTemplateModel:
         assert isinstance(variables, list)
         assert len(variables) == 3
     
+    def test_save_reextracts_variables_only_when_content_changes(self):
+        """Test saving re-parses variables only after the content changed."""
+        template = Template.objects.create(
+            title='Save Test',
+            content='{{a}}',
+            agent_role='qa',
+            workflow_phase='development',
+        )
+        template = Template.objects.get(pk=template.pk)
+        
+        with patch.object(Template, 'extract_variables') as extract:
+            template.title = 'Renamed'
+            template.save()
+        extract.assert_not_called()
+        
+        template.content = '{{a}} [b]'
+        template.save()
+        template.refresh_from_db()
+        assert template.get_variables_list() == ['a', 'b']
+    
+    def test_save_rederives_assigned_variables(self):
+        """Test variables assigned alongside unchanged content are re-derived on save."""
+        template = Template.objects.create(
+            title='Assigned Variables',
+            content='{{a}} [b]',
+            agent_role='qa',
+            workflow_phase='development',
+        )
+        template = Template.objects.get(pk=template.pk)
+        
+        template.variables = ['a', 'b', 'stale']
+        template.save()
+        template.refresh_from_db()
+        
+        assert template.variables == ['a', 'b']
+    
+    def test_save_caches_parsed_sections(self):
+        """Test saving stores parsed sections that round-trip through get_sections."""
+        template = Template.objects.create(
+            title='Sections Test',
+            content='## Your Role\nYou are a {{role}}.\n\n## Input\nTask',
+            agent_role='developer',
+            workflow_phase='development',
+        )
+        template.refresh_from_db()
+        
+        sections = template.get_sections()
+        assert [s.name for s in sections] == ['Your Role', 'Input']
+        assert sections[0].variables == ('role',)
+        assert sections[0].name is sys.intern('Your Role')
+        assert sections[0].name_lower == 'your role'
+    
     def test_string_representation(self):
         """Test string representation of template."""
         template = Template.objects.create(
@@ -250,6 +311,34 @@ class TestTemplateManagerFiltering:
         
         assert queryset.count() == 1
         assert queryset.first().title == 'Dev Planning'
+    
+    def test_search_matches_title_description_and_content(self):
+        """Test search matches case-insensitive substrings in any text column."""
+        Template.objects.create(
+            title='Authentication Template',
+            content='test',
+            agent_role='developer',
+            workflow_phase='development',
+        )
+        Template.objects.create(
+            title='Other',
+            description='Covers OAuth flows',
+            content='test',
+            agent_role='developer',
+            workflow_phase='development',
+        )
+        Template.objects.create(
+            title='Unrelated',
+            content='Nothing to see',
+            agent_role='developer',
+            workflow_phase='development',
+        )
+        
+        queryset = Template.objects.filter(is_active=True)
+        
+        assert Template.objects.search(queryset, 'AUTH').count() == 2
+        assert Template.objects.search(queryset, 'see').count() == 1
+        assert Template.objects.search(queryset, '').count() == 3
 
 
 @pytest.mark.django_db
@@ -324,3 +413,37 @@ class TestGeneratedPromptModel:
         prompts = list(GeneratedPrompt.objects.all())
         assert prompts[0].id == prompt2.id
         assert prompts[1].id == prompt1.id
+    
+    def test_bulk_create_from_forms(self):
+        """Test prompts for many forms are generated, validated and inserted in batches."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from forge.forms import DynamicPromptForm
+        
+        template = Template.objects.create(
+            title='Test', content='Hello {{name}}!', agent_role='developer', workflow_phase='development'
+        )
+        forms = [DynamicPromptForm({'name': name}, template=template) for name in ('Ann', 'Bob', 'Cy')]
+        assert all(form.is_valid() for form in forms)
+        
+        with CaptureQueriesContext(connection) as queries:
+            prompts = GeneratedPrompt.objects.bulk_create_from_forms(forms, batch_size=2)
+        
+        assert len(queries) == 2
+        assert [p.final_output for p in prompts] == ['Hello Ann!', 'Hello Bob!', 'Hello Cy!']
+        assert GeneratedPrompt.objects.filter(template=template).count() == 3
+        assert all(p.validation_report['is_valid'] is False for p in prompts)
+    
+    def test_dynamic_prompt_form_fields(self):
+        """Test form fields follow the template variables, with textareas for long content."""
+        from django import forms as django_forms
+        from forge.forms import DynamicPromptForm
+        
+        template = Template(content='{{project_context}} [Owner]', agent_role='developer')
+        template.refresh_derived_fields()
+        form = DynamicPromptForm({'project_context': 'Ctx', 'owner': 'Ann'}, template=template)
+        
+        assert isinstance(form.fields['project_context'].widget, django_forms.Textarea)
+        assert isinstance(form.fields['owner'].widget, django_forms.TextInput)
+        assert form.is_valid()
+        assert form.generate_output() == 'Ctx Ann'
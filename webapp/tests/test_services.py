@@ -37,6 +37,27 @@ class TestTemplateParser:
         assert 'name' in variables
         assert 'email' in variables
     
+    def test_extract_variables_deduplicates_repeated_names(self):
+        """Test repeated variables are reported once per syntax at first occurrence."""
+        content = "{{name}} and {{name}} and [name] and {{other}} and [name]"
+        variables = TemplateParser.extract_variables(content)
+        
+        keys = [(v.name, v.syntax) for v in variables]
+        assert keys == [
+            ('name', 'double_brace'),
+            ('name', 'single_bracket'),
+            ('other', 'double_brace'),
+        ]
+        assert variables[0].start_pos == 0
+    
+    def test_extract_variables_default_value_keeps_colons(self):
+        """Test default values are split on the first colon only."""
+        variables = TemplateParser.extract_variables("{{url:http://example.com}} {{plain}}")
+        
+        assert variables[0].name == 'url'
+        assert variables[0].default_value == 'http://example.com'
+        assert variables[1].default_value is None
+    
     def test_detect_sections(self):
         """Test section detection."""
         content = """
@@ -55,6 +76,30 @@ Format output
         assert '## Input' in sections
         assert '## Output Requirements' in sections
     
+    def test_detect_sections_case_insensitive(self):
+        """Test sections are matched case-insensitively and keyed by canonical name."""
+        content = "## YOUR ROLE\nDeveloper\n\n## input\nTask"
+        sections = TemplateParser.detect_sections(content)
+        
+        assert sections['## Your Role'] == (0, len('## Your Role'))
+        assert '## Input' in sections
+    
+    def test_detect_sections_ignores_non_ascii_case_folds(self):
+        """Test headings that only match via Unicode case folds are not sections."""
+        assert TemplateParser.detect_sections("## ınput") == {}
+        assert list(TemplateParser.detect_sections("## Your Role\n## Conſtraints")) == ['## Your Role']
+        assert BMADValidator.validate("## İnput\n").missing_sections == list(TemplateParser.REQUIRED_SECTIONS)
+    
+    def test_detect_sections_matches_regex_fallback(self, monkeypatch):
+        """Test the optional Aho-Corasick path agrees with the regex fallback."""
+        content = "Intro\n## Input\nTask\n## your role\nDev\n## Notes\n## Input again"
+        sections = TemplateParser.detect_sections(content)
+        
+        monkeypatch.setattr(TemplateParser, 'SECTION_AUTOMATON', None)
+        
+        assert TemplateParser.detect_sections(content) == sections
+        assert list(sections) == ['## Input', '## Your Role', '## Notes']
+    
     def test_check_required_sections_all_present(self):
         """Test required sections check when all present."""
         content = """
@@ -81,9 +126,37 @@ Developer
         is_valid, missing = TemplateParser.check_required_sections(content)
         
         assert is_valid is False
-        assert len(missing) == 2
-        assert '## Input' in missing
-        assert '## Output Requirements' in missing
+        assert set(missing) == {'## Input', '## Output Requirements'}
+    
+    def test_check_required_sections_reports_canonical_order(self):
+        """Test missing sections keep the canonical order whatever the document order."""
+        content = "## output requirements\nFormat.\n"
+        
+        is_valid, missing = TemplateParser.check_required_sections(content)
+        
+        assert is_valid is False
+        assert missing == ['## Your Role', '## Input']
+        assert TemplateParser.check_required_sections("## Input ## Your Role ## Output Requirements") == (True, [])
+    
+    def test_check_required_sections_ignores_non_ascii_case_folds(self):
+        """Test required-section checks treat Unicode-only case folds as missing."""
+        assert TemplateParser.check_required_sections("## ınput\n") == (False, list(TemplateParser.REQUIRED_SECTIONS))
+        assert BMADValidator.quick_validate("## ınput\n")[0] is False
+    
+    def test_required_section_checks_agree(self):
+        """Test every required-section check reports the same missing sections."""
+        contents = [
+            "",
+            "## Input\n## Context\n",
+            "## YOUR ROLE\n## input\n## Output Requirements\n",
+            "## Output Requirements then ## Your Role",
+        ]
+        for content in contents:
+            _, missing = TemplateParser.check_required_sections(content)
+            
+            assert TemplateParser.missing_required_sections(TemplateParser.detect_sections(content)) == missing
+            assert BMADValidator.validate(content).missing_sections == missing
+            assert TemplateParser.validate_template(content)['is_valid'] == (not missing)
     
     def test_substitute_variables(self):
         """Test variable substitution."""
@@ -94,6 +167,38 @@ Developer
         
         assert result == "Hello Alice, you work at ACME."
     
+    def test_substitute_variables_single_pass(self):
+        """Test both syntaxes are replaced once and unknown variables are left intact."""
+        content = "{{a}} [a] {{b}} [missing]"
+        values = {'a': '{{b}}', 'b': 2}
+        
+        result = TemplateParser.substitute_variables(content, values)
+        
+        assert result == "{{b}} {{b}} 2 [missing]"
+    
+    def test_substitute_variables_non_string_values(self):
+        """Test every supplied value is substituted as a string, including None and 0."""
+        content = "{{a}} [b] {{c:fallback}} {{d}}"
+        
+        result = TemplateParser.substitute_variables(content, {'a': None, 'b': 0, 'c': ''})
+        
+        assert result == "None 0  {{d}}"
+    
+    def test_substitute_variables_without_placeholders(self):
+        """Test content without placeholder openers is returned unchanged."""
+        content = "Plain text {single} braces only"
+        
+        assert TemplateParser.substitute_variables(content, {'single': 'x'}) is content
+        assert TemplateParser.substitute_variables("[a] {{b}}", {'a': 1, 'b': 2}) == "1 2"
+    
+    def test_substitute_variables_uses_defaults(self):
+        """Test {{VAR:default}} placeholders fall back to their default value."""
+        content = "{{name:John}} <{{email:}}> {{team:Core}}"
+        
+        result = TemplateParser.substitute_variables(content, {'team': 'QA'})
+        
+        assert result == "John <> QA"
+    
     def test_find_unreplaced_variables(self):
         """Test finding unreplaced variables."""
         content = "Hello {{name}}, {{greeting}}!"
@@ -105,6 +210,28 @@ Developer
         
         assert 'greeting' in unreplaced
     
+    def test_variable_scans_mix_syntaxes(self):
+        """Test both variable scans handle every syntax in mixed content."""
+        content = "{{b:x}} [a] {{c}} {{b}} [not valid] {{d:}}"
+        
+        assert TemplateParser.extract_variables_simple(content) == ['a', 'b', 'c', 'd']
+        # Placeholders with defaults are not reported as unreplaced
+        assert TemplateParser.find_unreplaced_variables(content) == ['a', 'b', 'c']
+    
+    def test_parsing_uses_precompiled_patterns(self):
+        """Test the parser's hot paths never compile a regex per call."""
+        import re
+        from unittest.mock import patch
+        
+        content = "## Your Role\n{{name}} [team] {{lead:Ann}}\n## Input\n"
+        with patch.object(re, '_compile', side_effect=AssertionError('regex compiled per call')):
+            TemplateParser.extract_variables(content)
+            TemplateParser.extract_variables_simple(content)
+            TemplateParser.find_unreplaced_variables(content)
+            TemplateParser.detect_sections(content)
+            TemplateParser.check_required_sections(content)
+            TemplateParser.substitute_variables(content, {'name': 'Bo'})
+    
     def test_validate_template_valid(self):
         """Test template validation with valid template."""
         content = """
@@ -129,6 +256,29 @@ Provide code with tests.
         
         assert result['is_valid'] is False
         assert len(result['errors']) > 0
+    
+    def test_validate_template_cached_results_are_independent(self):
+        """Test cached validation results can be mutated without affecting later calls."""
+        content = "## Your Role\n{{role}}"
+        first = TemplateParser.validate_template(content)
+        first['errors'].append('mutated')
+        first['variables'][0]['name'] = 'mutated'
+        
+        second = TemplateParser.validate_template(content)
+        
+        assert 'mutated' not in second['errors']
+        assert second['variables'][0]['name'] == 'role'
+    
+    def test_validate_template_skips_cache_for_long_content(self, monkeypatch):
+        """Test templates at the length limit are validated without entering the cache."""
+        monkeypatch.setattr(TemplateParser, 'MAX_CACHED_CONTENT_LENGTH', 10)
+        content = "## Your Role\n{{role}}"
+        TemplateParser._validate_template_cached.cache_clear()
+        
+        result = TemplateParser.validate_template(content)
+        
+        assert result['variables'][0]['name'] == 'role'
+        assert TemplateParser._validate_template_cached.cache_info().currsize == 0
 
 
 class TestBMADValidator:
@@ -213,30 +363,139 @@ Format
         
         assert is_valid is False
         assert len(issues) > 0
+    
+    def test_validate_many_matches_validate(self, monkeypatch):
+        """Test batch validation matches per-prompt validation, serially and in workers."""
+        prompts = ["Missing everything {{name}}", "## Your Role\n## Input\n## Output Requirements\n"]
+        contents = prompts + [prompts[0]]
+        expected = [BMADValidator.validate(content) for content in contents]
+        
+        serial = BMADValidator.validate_many(contents)
+        monkeypatch.setattr(BMADValidator, 'PARALLEL_VALIDATE_MIN', 1)
+        parallel = BMADValidator.validate_many(contents)
+        
+        assert serial == expected
+        assert parallel == expected
+        # Repeated prompts still get independent reports
+        serial[0].notes.append('changed')
+        assert serial[2].notes == expected[2].notes
+    
+    def test_validate_detects_sections_once(self):
+        """Test the full validation derives missing sections from one section scan."""
+        from unittest.mock import patch
+        
+        prompt = "## Input\nSome task details here.\n## Context\n"
+        with patch.object(TemplateParser, 'check_required_sections', side_effect=AssertionError), \
+                patch.object(TemplateParser, 'detect_sections', wraps=TemplateParser.detect_sections) as detect:
+            report = BMADValidator._build_report(prompt)
+        
+        assert detect.call_count == 1
+        assert report.missing_sections == ['## Your Role', '## Output Requirements']
+    
+    def test_validate_word_count_thresholds_and_variable_bonus(self):
+        """Test the short-content checks and the bonus for fully replaced variables."""
+        def messages(report):
+            return [result.message for result in report.results]
+        
+        short, medium, long_enough = (BMADValidator.validate("word " * n) for n in (49, 60, 120))
+        
+        assert "Prompt content seems very short (< 50 words)" in messages(short)
+        assert short.notes == []
+        assert medium.notes == ["Prompt is relatively short; consider adding more context"]
+        assert long_enough.notes == [] and messages(long_enough) == messages(medium)
+        # A {{VAR:default}} placeholder is a variable but is not reported as unreplaced
+        prompt = (
+            "## Your Role\nYou are a senior developer.\n## Input\nThe task description.\n"
+            "## Output Requirements\nReturn a structured response.\n" + "word " * 120
+        )
+        assert BMADValidator.validate(prompt + "{{tone:formal}}").score == BMADValidator.validate(prompt).score + 10
+    
+    def test_validate_section_bodies_end_at_next_section(self):
+        """Test section content checks only look up to the next detected section."""
+        prompt = (
+            "## Your Role\nDev\n## Input\nA sufficiently long task description.\n"
+            "## Output Requirements\nBe brief.\n## Notes\nReturn the format as JSON."
+        )
+        messages = [result.message for result in BMADValidator.validate(prompt).results]
+        
+        assert "'## Your Role' section appears to have minimal content" in messages
+        assert "'## Input' section appears to have minimal content" not in messages
+        # The format keywords under ## Notes do not count for ## Output Requirements
+        assert "'## Output Requirements' should specify the expected output format" in messages
+    
+    def test_missing_section_messages_are_shared(self):
+        """Test reports for different prompts reuse the same message strings."""
+        first = BMADValidator.validate("First prompt")
+        second = BMADValidator.validate("Second prompt")
+        
+        assert first.results[0].message is second.results[0].message
+        assert BMADValidator.quick_validate("a")[1][0] is BMADValidator.quick_validate("b")[1][0]
+    
+    def test_validate_cached_reports_are_independent(self):
+        """Test repeated validation reuses the cached report without sharing its lists."""
+        prompt = "Missing everything {{name}}"
+        
+        first = BMADValidator.validate(prompt)
+        first.missing_sections.clear()
+        first.notes.append('changed')
+        second = BMADValidator.validate(prompt)
+        issues = BMADValidator.quick_validate(prompt)[1]
+        issues.clear()
+        
+        assert len(second.missing_sections) == 3
+        assert 'changed' not in second.notes
+        assert second.results == first.results
+        assert len(BMADValidator.quick_validate(prompt)[1]) == 4
+    
+    def test_validate_skips_cache_for_large_prompts(self, monkeypatch):
+        """Test prompts over the size limit are validated without caching."""
+        monkeypatch.setattr(BMADValidator, 'MAX_CACHED_CONTENT_LENGTH', 10)
+        BMADValidator._validate_cached.cache_clear()
+        
+        report = BMADValidator.validate("Longer than ten characters")
+        
+        assert report.missing_sections == list(TemplateParser.REQUIRED_SECTIONS)
+        assert BMADValidator._validate_cached.cache_info().currsize == 0
+
+
+@pytest.fixture(scope='module')
+def service():
+    """One default GitHubSyncService shared by the module; tests patch it with monkeypatch."""
+    return GitHubSyncService()
 
 
 class TestGitHubSyncService:
     """Tests for the GitHubSyncService."""
     
-    def test_detect_agent_role_from_filename(self):
+    @pytest.mark.parametrize("filename,expected", [
+        ('developer_template.md', 'developer'),
+        ('analyst_report.md', 'analyst'),
+        ('pm_planning.md', 'pm'),
+    ])
+    def test_detect_agent_role_from_filename(self, service, filename, expected):
         """Test agent role detection from filename."""
-        service = GitHubSyncService()
-        
-        assert service.detect_agent_role('content', 'developer_template.md') == 'developer'
-        assert service.detect_agent_role('content', 'analyst_report.md') == 'analyst'
-        assert service.detect_agent_role('content', 'pm_planning.md') == 'pm'
+        assert service.detect_agent_role('content', filename) == expected
     
-    def test_detect_workflow_phase_from_filename(self):
+    @pytest.mark.parametrize("filename,expected", [
+        ('planning_template.md', 'planning'),
+        ('development_sprint.md', 'development'),
+    ])
+    def test_detect_workflow_phase_from_filename(self, service, filename, expected):
         """Test workflow phase detection from filename."""
-        service = GitHubSyncService()
-        
-        assert service.detect_workflow_phase('content', 'planning_template.md') == 'planning'
-        assert service.detect_workflow_phase('content', 'development_sprint.md') == 'development'
+        assert service.detect_workflow_phase('content', filename) == expected
+    
+    def test_detect_rules_keep_priority_order(self, service):
+        """Test earlier rules win even when a later rule's keyword comes first in the name."""
+        role_content = "## Your Role\nYou are a Scrum Master and developer.\n## Input\narchitect"
+        
+        assert service.detect_agent_role('content', 'dev_analyst.md') == 'analyst'
+        assert service.detect_agent_role(role_content, 'notes.md') == 'scrum_master'
+        assert service.detect_agent_role('## Your Role\nNothing here', 'notes.md') == 'developer'
+        assert service.detect_workflow_phase('content', 'dev_plan.md') == 'planning'
+        assert service.detect_workflow_phase('In the Planning Phase', 'notes.md') == 'planning'
     
-    def test_parse_template_description(self):
+    def test_parse_template_description(self, service):
         """Test description extraction from template."""
-        service = GitHubSyncService()
-        
         content = """This is a brief description.
 
 More details here.
@@ -248,6 +507,51 @@ More details here.
         assert 'brief description' in description
         assert '## Your Role' not in description
     
+    def test_parse_template_description_first_three_lines(self, service):
+        """Test the description keeps at most three lines before the first heading."""
+        assert service.parse_template_description("A\nB\n\nC\nD\n## Input") == 'A B C'
+        assert service.parse_template_description("A\n### Deep\nB") == 'A'
+        assert service.parse_template_description("# Title\nBody") == ''
+    
+    def test_parse_template_description_after_crlf_frontmatter(self, service):
+        """Test frontmatter and the preamble are found in CRLF content."""
+        content = "---\r\nrole: qa\r\n---\r\nLead line.\r\nSecond.\r\n## Your Role\r\nBody"
+        
+        frontmatter, remaining = service.parse_frontmatter(content)
+        
+        assert frontmatter == {'role': 'qa'}
+        assert remaining.startswith('Lead line.')
+        assert service.parse_template_description(content) == 'Lead line. Second.'
+        assert service.parse_frontmatter("---\nrole: qa") == ({}, "---\nrole: qa")
+    
+    def test_parse_template_description_reads_only_preamble(self, service):
+        """Test text after the first heading does not affect the description."""
+        content = "\n\n  Lead paragraph.  \n## Your Role\n" + "Body line\n" * 10_000
+        
+        assert service.parse_template_description(content) == 'Lead paragraph.'
+        assert service.parse_template_description("Only line") == 'Only line'
+        assert service.parse_template_description("") == ''
+    
+    def test_detect_agent_role_ignores_unhashable_frontmatter_role(self, service):
+        """Test a list-valued 'role' frontmatter field falls back to auto-detection."""
+        content = "---\nrole: [developer]\nworkflow_phase: [planning]\n---\nBody"
+        
+        assert service.detect_agent_role(content, 'analyst.md') == 'analyst'
+        assert service.detect_agent_roles(content, 'analyst.md') == ['analyst']
+        assert service.detect_workflow_phase(content, 'planning.md') == 'planning'
+    
+    def test_detect_workflow_phase_keyword_counts(self, service):
+        """Test the last-resort phase heuristic compares keyword hits."""
+        assert service.detect_workflow_phase('Roadmap and backlog analysis for code', 'x.md') == 'planning'
+        assert service.detect_workflow_phase('Roadmap for code refactor', 'x.md') == 'development'
+        assert service.detect_workflow_phase('Nothing relevant', 'x.md') == 'development'
+    
+    def test_detect_agent_roles_drops_repeats(self, service):
+        """Test repeated frontmatter roles are listed once, in first-seen order."""
+        content = "---\nroles: [qa, developer, qa, [nested], developer]\n---\nBody"
+        
+        assert service.detect_agent_roles(content, 'x.md') == ['qa', 'developer']
+    
     def test_init_with_token(self):
         """Test service initialization with token."""
         service = GitHubSyncService(token='test-token')
@@ -255,29 +559,63 @@ More details here.
         assert service.token == 'test-token'
         assert 'Authorization' in service.headers
     
-    def test_fetch_directory_contents_recursive_files_only(self):
-        """Test recursive fetch returns only files when directory has no subdirectories."""
-        service = GitHubSyncService()
+    def test_headers_are_per_instance_copies(self):
+        """Test instance headers are built from the shared base without mutating it."""
+        service = GitHubSyncService(token='test-token')
+        service.headers['X-Test'] = '1'
+        
+        assert service.headers['Authorization'] == 'Bearer test-token'
+        assert service.headers['Accept'] == GitHubSyncService.BASE_HEADERS['Accept']
+        assert 'X-Test' not in GitHubSyncService.BASE_HEADERS
+        assert 'Authorization' not in GitHubSyncService.BASE_HEADERS
+    
+    def test_fetch_directory_contents_revalidates_with_etag(self):
+        """Test a repeated fetch sends If-None-Match and reuses the body on 304."""
+        from unittest.mock import Mock
+        
+        listing = '[{"name": "a.md", "path": "t/a.md", "type": "file"}]'
+        service = GitHubSyncService(token='test-token')
+        service.session.get = Mock(side_effect=[
+            Mock(status_code=200, text=listing, headers={'ETag': '"v1"'}),
+            Mock(status_code=304, text='', headers={}),
+        ])
+        
+        first = service.fetch_directory_contents('owner', 'repo', 'main', 't')
+        first.clear()
+        
+        assert service.fetch_directory_contents('owner', 'repo', 'main', 't')[0]['path'] == 't/a.md'
+        sent = service.session.get.call_args_list
+        assert 'If-None-Match' not in sent[0].kwargs['headers']
+        assert sent[1].kwargs['headers']['If-None-Match'] == '"v1"'
+        assert sent[1].kwargs['headers']['Authorization'] == 'Bearer test-token'
+    
+    def test_response_cache_is_per_instance(self):
+        """Test cached response bodies stay with the service that fetched them."""
+        from unittest.mock import Mock
+        
+        service = GitHubSyncService(token='test-token')
+        service.session.get = Mock(return_value=Mock(status_code=200, text='[]', headers={'ETag': '"v1"'}))
+        service.fetch_directory_contents('owner', 'repo', 'main', 't')
         
-        # Mock fetch_directory_contents to return files only
-        original_fetch = service.fetch_directory_contents
-        service.fetch_directory_contents = lambda o, r, b, p: [
+        assert len(service._response_cache) == 1
+        assert not any('test-token' in key for key in service._response_cache)
+        assert len(GitHubSyncService(token='test-token')._response_cache) == 0
+    
+    def test_fetch_directory_contents_recursive_files_only(self, service, monkeypatch):
+        """Test recursive fetch returns only files when directory has no subdirectories."""
+        # Mock fetch_directory_contents to return files only (restored automatically)
+        monkeypatch.setattr(service, 'fetch_directory_contents', lambda o, r, b, p: [
             {'name': 'file1.md', 'path': 'templates/file1.md', 'type': 'file'},
             {'name': 'file2.md', 'path': 'templates/file2.md', 'type': 'file'},
-        ]
+        ])
         
         result = service.fetch_directory_contents_recursive('owner', 'repo', 'main', 'templates')
         
         assert len(result) == 2
         assert all(item['type'] == 'file' for item in result)
-        
-        # Restore original method
-        service.fetch_directory_contents = original_fetch
     
-    def test_fetch_directory_contents_recursive_with_subdirectories(self):
+    def test_fetch_directory_contents_recursive_with_subdirectories(self, service, monkeypatch):
         """Test recursive fetch traverses subdirectories and returns all files."""
-        service = GitHubSyncService()
-        
         # Track calls to verify recursion
         call_paths = []
         
@@ -299,7 +637,7 @@ More details here.
                 ]
             return []
         
-        service.fetch_directory_contents = mock_fetch
+        monkeypatch.setattr(service, 'fetch_directory_contents', mock_fetch)
         
         result = service.fetch_directory_contents_recursive('owner', 'repo', 'main', 'templates')
         
@@ -315,20 +653,16 @@ More details here.
         assert 'templates/subdir' in call_paths
         assert 'templates/subdir/nested' in call_paths
     
-    def test_fetch_directory_contents_recursive_empty_directory(self):
+    def test_fetch_directory_contents_recursive_empty_directory(self, service, monkeypatch):
         """Test recursive fetch handles empty directories gracefully."""
-        service = GitHubSyncService()
-        
-        service.fetch_directory_contents = lambda o, r, b, p: []
+        monkeypatch.setattr(service, 'fetch_directory_contents', lambda o, r, b, p: [])
         
         result = service.fetch_directory_contents_recursive('owner', 'repo', 'main', 'templates')
         
         assert result == []
     
-    def test_fetch_directory_contents_recursive_mixed_content(self):
+    def test_fetch_directory_contents_recursive_mixed_content(self, service, monkeypatch):
         """Test recursive fetch correctly filters files from mixed directory content."""
-        service = GitHubSyncService()
-        
         def mock_fetch(owner, repo, branch, path):
             if path == 'templates':
                 return [
@@ -340,7 +674,7 @@ More details here.
                 return []  # Empty subdirectory
             return []
         
-        service.fetch_directory_contents = mock_fetch
+        monkeypatch.setattr(service, 'fetch_directory_contents', mock_fetch)
         
         result = service.fetch_directory_contents_recursive('owner', 'repo', 'main', 'templates')
         
@@ -348,10 +682,8 @@ More details here.
         assert len(result) == 2
         assert all(item['type'] == 'file' for item in result)
     
-    def test_fetch_directory_contents_recursive_max_depth_protection(self):
+    def test_fetch_directory_contents_recursive_max_depth_protection(self, service, monkeypatch):
         """Test recursive fetch stops at maximum depth to prevent excessive recursion."""
-        service = GitHubSyncService()
-        
         # Create a deeply nested structure that exceeds MAX_RECURSION_DEPTH
         def mock_fetch(owner, repo, branch, path):
             depth = path.count('/') + 1
@@ -360,17 +692,15 @@ More details here.
                 {'name': f'level_{depth + 1}', 'path': f'{path}/level_{depth + 1}', 'type': 'dir'},
             ]
         
-        service.fetch_directory_contents = mock_fetch
+        monkeypatch.setattr(service, 'fetch_directory_contents', mock_fetch)
         
         result = service.fetch_directory_contents_recursive('owner', 'repo', 'main', 'level_0')
         
         # Should stop at MAX_RECURSION_DEPTH (10), so we get files from levels 0-9
         assert len(result) <= service.MAX_RECURSION_DEPTH
     
-    def test_fetch_directory_contents_recursive_circular_reference_protection(self):
+    def test_fetch_directory_contents_recursive_circular_reference_protection(self, service, monkeypatch):
         """Test recursive fetch handles circular references (symlinks) gracefully."""
-        service = GitHubSyncService()
-        
         call_count = [0]  # Use list to allow modification in nested function
         
         def mock_fetch(owner, repo, branch, path):
@@ -390,7 +720,7 @@ More details here.
                 ]
             return []
         
-        service.fetch_directory_contents = mock_fetch
+        monkeypatch.setattr(service, 'fetch_directory_contents', mock_fetch)
         
         result = service.fetch_directory_contents_recursive('owner', 'repo', 'main', 'templates')
         
@@ -399,6 +729,46 @@ More details here.
         file_paths = [f['path'] for f in result]
         assert 'templates/file1.md' in file_paths
         assert 'templates/subdir/file2.md' in file_paths
+    
+    def test_fetch_directory_contents_recursive_depth_first_order(self, service, monkeypatch):
+        """Test files keep depth-first order and each directory is fetched once."""
+        tree = {
+            'root': ['root/a', 'root/a.md', 'root/b', 'root/c.md'],
+            'root/a': ['root/a/x.md', 'root/b'],
+            'root/b': ['root/b/y.md'],
+        }
+        calls = []
+        
+        def mock_fetch(owner, repo, branch, path):
+            calls.append(path)
+            return [
+                {'path': item, 'type': 'file' if item.endswith('.md') else 'dir'}
+                for item in tree.get(path, [])
+            ]
+        monkeypatch.setattr(service, 'fetch_directory_contents', mock_fetch)
+        
+        result = service.fetch_directory_contents_recursive('owner', 'repo', 'main', 'root')
+        
+        assert [f['path'] for f in result] == ['root/a/x.md', 'root/b/y.md', 'root/a.md', 'root/c.md']
+        assert sorted(calls) == ['root', 'root/a', 'root/b']
+    
+    def test_fetch_directory_contents_recursive_fetches_level_concurrently(self, service, monkeypatch):
+        """Test sibling directories are fetched at the same time."""
+        import threading
+        
+        # Both siblings must be inside fetch at once for the barrier to release
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def mock_fetch(owner, repo, branch, path):
+            if path == 'root':
+                return [{'path': 'root/a', 'type': 'dir'}, {'path': 'root/b', 'type': 'dir'}]
+            barrier.wait()
+            return [{'path': f'{path}/file.md', 'type': 'file'}]
+        monkeypatch.setattr(service, 'fetch_directory_contents', mock_fetch)
+        
+        result = service.fetch_directory_contents_recursive('owner', 'repo', 'main', 'root')
+        
+        assert [f['path'] for f in result] == ['root/a/file.md', 'root/b/file.md']
 
 
 class TestDocumentGenerator:
@@ -427,6 +797,50 @@ More content here.
         assert 'Section One' in section_names
         assert 'Section Two' in section_names
     
+    def test_scan_headings_single_pass(self):
+        """Test headings are found on their own lines with levels and spans."""
+        from forge.services.document_generator import scan_headings
+        
+        content = "# Title  \nText with ## inline\n##\nNot a heading\n### Sub\tpart\n"
+        
+        sub_start = content.index('### Sub')
+        
+        assert scan_headings(content) == (
+            (1, 'Title', 0, 9),
+            (3, 'Sub\tpart', sub_start, sub_start + len('### Sub\tpart')),
+        )
+    
+    def test_extract_sections_offsets_slice_source(self):
+        """Test each section spans its heading and body in the original content."""
+        from forge.services import DocumentGenerator
+        
+        content = "Intro\n## One\n\nFirst body.\n\n### Two\nSecond body.\n"
+        sections = DocumentGenerator.extract_sections(content)
+        
+        assert [(s.name, s.level) for s in sections] == [('One', 2), ('Two', 3)]
+        assert sections[0].end_pos == sections[1].start_pos
+        assert sections[-1].end_pos == len(content)
+        for section in sections:
+            source = content[section.start_pos:section.end_pos]
+            assert source.startswith('#')
+            assert source.strip().endswith(section.content)
+    
+    def test_extract_sections_cached_and_immutable(self):
+        """Test repeated extraction is served from cache without sharing the list."""
+        import dataclasses
+        from forge.services import DocumentGenerator
+        
+        content = "## One\nFirst.\n\n## Two\nSecond."
+        first = DocumentGenerator.extract_sections(content)
+        first.pop()
+        second = DocumentGenerator.extract_sections(content)
+        
+        assert [s.name for s in second] == ['One', 'Two']
+        assert second[0] is first[0]
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            second[0].name = 'Changed'
+        assert hash(second[0]) == hash(DocumentGenerator.extract_sections(content)[0])
+    
     def test_validate_section_content_valid(self):
         """Test section validation with valid content."""
         from forge.services import DocumentGenerator
@@ -449,8 +863,7 @@ More content here.
         )
         
         assert result.is_valid is False
-        assert 'file_name' in result.unreplaced_variables
-        assert 'data_source' in result.unreplaced_variables
+        assert {'file_name', 'data_source'} <= set(result.unreplaced_variables)
     
     def test_validate_section_content_short_content(self):
         """Test section validation warns about short content."""
@@ -464,6 +877,132 @@ More content here.
         # Should have warnings about short content
         assert len(result.warnings) > 0
     
+    def test_generate_document_with_cached_sections(self):
+        """Test generate_document gives the same output with pre-extracted sections."""
+        from forge.services import DocumentGenerator
+        
+        content = "## Your Role\nYou are a {{role}}.\n\n## Input\nTask description."
+        section_data = {'Your Role': 'Extra role detail', 'Input': 'Extra input detail'}
+        variable_data = {'role': 'developer'}
+        sections = DocumentGenerator.extract_sections(content)
+        
+        cached_doc, _ = DocumentGenerator.generate_document(
+            content, section_data, variable_data, sections=sections
+        )
+        parsed_doc, _ = DocumentGenerator.generate_document(content, section_data, variable_data)
+        
+        assert cached_doc == parsed_doc
+        assert "You are a developer.\n\nExtra role detail" in cached_doc
+        assert "Task description.\n\nExtra input detail" in cached_doc
+    
+    def test_generate_document_splices_into_matching_section(self):
+        """Test user content lands in its own section even when section text repeats."""
+        from forge.services import DocumentGenerator
+        
+        content = "## Your Role\nTBD.\n\n## Input\nTBD.\n"
+        document, _ = DocumentGenerator.generate_document(content, {'Input': 'Input detail'}, {})
+        
+        assert document == "## Your Role\nTBD.\n\n## Input\nTBD.\n\nInput detail\n"
+    
+    def test_generate_document_reports_unreplaced_variables(self):
+        """Test unreplaced variables from the template and inserted content are reported."""
+        from forge.services import DocumentGenerator
+        
+        content = "## Your Role\nYou are a {{role}} in [team].\n\n## Input\nTask description."
+        section_data = {'Input': 'Use the {{dataset}} provided.'}
+        
+        document, validations = DocumentGenerator.generate_document(
+            content, section_data, {'role': 'developer'}
+        )
+        
+        assert 'You are a developer in [team].' in document
+        assert validations[-1].section_name == 'Document'
+        assert validations[-1].unreplaced_variables == ['dataset', 'team']
+    
+    def test_generate_document_substitutes_many_variables_in_one_pass(self):
+        """Test a template with many markers matches per-key replacement in one scan."""
+        from unittest.mock import patch
+        from forge.services import DocumentGenerator
+        from forge.services import document_generator
+        
+        names = [f'var_{i}' for i in range(200)]
+        content = "## Your Role\n" + " ".join(f"{{{{{name}}}}} [{name}]" for name in names)
+        values = {name: name.upper() for name in names[:150]}
+        expected = content
+        for name, value in values.items():
+            expected = expected.replace(f"{{{{{name}}}}}", value).replace(f"[{name}]", value)
+        
+        pattern = document_generator.VARIABLE_PATTERN
+        with patch.object(document_generator, 'VARIABLE_PATTERN', wraps=pattern) as scanner:
+            document, validations = DocumentGenerator.generate_document(content, {}, values)
+        
+        assert document == expected
+        assert scanner.sub.call_count == 1
+        assert validations[-1].unreplaced_variables == sorted(names[150:])
+    
+    def test_section_description_uses_first_three_lines(self):
+        """Test descriptions skip list/heading lines and ignore text past line three."""
+        from forge.services import DocumentGenerator
+        
+        content = "\n  First line.\n- bullet\nSecond line.\nFourth line is ignored."
+        markers = "# Heading\n* item\n1. step"
+        numbers = "10 items\n[VAR]\n12. step"
+        long_content = "x" * 200
+        
+        assert DocumentGenerator._generate_section_description(content) == "First line. Second line."
+        assert DocumentGenerator._generate_section_description(long_content) == "x" * 147 + "..."
+        assert DocumentGenerator._generate_section_description("") == ""
+        assert DocumentGenerator._generate_section_description(markers) == ""
+        assert DocumentGenerator._generate_section_description(numbers) == "10 items 12. step"
+    
+    def test_word_count_stops_at_threshold(self):
+        """Test word counting is exact below the threshold and capped at it."""
+        from forge.services.document_generator import _word_count_at_least
+        
+        assert _word_count_at_least("one  two\nthree", 10) == (3, False)
+        assert _word_count_at_least("word " * 100, 10) == (10, True)
+        assert _word_count_at_least("", 1) == (0, False)
+    
+    def test_validate_section_content_uses_known_variables(self):
+        """Test pre-extracted variables (e.g. from a parsed section) skip re-extraction."""
+        from unittest.mock import patch
+        from forge.services import DocumentGenerator
+        
+        section = DocumentGenerator.extract_sections("## Your Role\nYou are {{role}} on [team].\n")[0]
+        expected = DocumentGenerator.validate_section_content(section.name, section.content)
+        
+        with patch.object(DocumentGenerator, '_extract_variables_from_text', side_effect=AssertionError):
+            result = DocumentGenerator.validate_section_content(
+                section.name, section.content, section.name_lower, unreplaced=section.variables
+            )
+        
+        assert result == expected
+        assert result.unreplaced_variables == ['role', 'team']
+    
+    def test_validate_section_content_suggestions(self):
+        """Test suggestions are added only when no section keyword is present."""
+        from forge.services import DocumentGenerator
+        
+        covered = DocumentGenerator.validate_section_content("Your Role", "Handle TASKS daily.")
+        missing = DocumentGenerator.validate_section_content("Output Requirements", "Be brief.")
+        
+        assert covered.suggestions == []
+        assert len(missing.suggestions) == 1
+        assert 'output format' in missing.suggestions[0]
+    
+    def test_section_name_lower_precomputed(self):
+        """Test sections carry their lowercased name for suggestion checks."""
+        from forge.services.document_generator import DocumentGenerator, TemplateSection
+        
+        section = DocumentGenerator.extract_sections("## Output Requirements\nBe brief.")[0]
+        result = DocumentGenerator.validate_section_content(
+            section.name, "Be brief.", section.name_lower
+        )
+        
+        assert section.name_lower == 'output requirements'
+        assert TemplateSection(name='Your Role', level=2, content='').name_lower == 'your role'
+        assert len(result.suggestions) == 1
+    
     def test_get_wizard_steps(self):
         """Test generating wizard steps from template content."""
         from forge.services import DocumentGenerator
@@ -484,6 +1023,63 @@ Format specifications.
         assert steps[1]['section_name'] == 'Input'
         assert steps[2]['section_name'] == 'Output Requirements'
     
+    def test_section_questions_cached_per_section(self):
+        """Test equal sections share cached questions but callers get fresh dicts."""
+        from forge.services import DocumentGenerator
+        
+        content = "## Your Role\nYou are {{role_name}}.\n"
+        first = DocumentGenerator.get_section_questions(DocumentGenerator.extract_sections(content)[0])
+        first[0]['label'] = 'changed'
+        # An equal section rebuilt from stored data, as Template.get_sections does
+        section = DocumentGenerator.extract_sections(content)[0]
+        rebuilt = type(section)(**{name: getattr(section, name) for name in section.__slots__})
+        second = DocumentGenerator.get_section_questions(rebuilt)
+        
+        assert second[0]['label'] == 'Role Name'
+        assert second[1]['name'] == 'section_your_role'
+        assert DocumentGenerator._section_questions_cached.cache_info().hits >= 1
+    
+    def test_section_parsing_is_shared_across_entry_points(self):
+        """Test sections, wizard steps and document generation parse the content once."""
+        from forge.services import DocumentGenerator
+        
+        content = "## Your Role\nYou are {{role}}.\n\n## Input\nTask.\n"
+        DocumentGenerator._extract_sections_cached.cache_clear()
+        
+        DocumentGenerator.extract_sections(content)
+        DocumentGenerator.get_wizard_steps(content)
+        list(DocumentGenerator.iter_wizard_steps(content, start=2))
+        DocumentGenerator.generate_document(content, {'Input': 'More.'}, {'role': 'dev'})
+        
+        info = DocumentGenerator._extract_sections_cached.cache_info()
+        assert (info.misses, info.hits) == (1, 3)
+    
+    def test_extract_sections_skips_cache_for_long_content(self, monkeypatch):
+        """Test content at the length limit is parsed without entering the cache."""
+        from forge.services import DocumentGenerator
+        
+        monkeypatch.setattr(DocumentGenerator, 'MAX_CACHED_CONTENT_LENGTH', 40)
+        content = "## Your Role\nYou are {{role}}.\n\n## Input\nA longer task.\n"
+        DocumentGenerator._extract_sections_cached.cache_clear()
+        
+        sections = DocumentGenerator.extract_sections(content)
+        steps = DocumentGenerator.get_wizard_steps(content)
+        
+        assert [s.name for s in sections] == ['Your Role', 'Input']
+        assert len(steps) == 2
+        assert DocumentGenerator._extract_sections_cached.cache_info().currsize == 0
+    
+    def test_iter_wizard_steps_from_start(self):
+        """Test streaming wizard steps from a given step matches the full list."""
+        from forge.services import DocumentGenerator
+        
+        content = "## Your Role\nDev {{a}}.\n\n## Input\nTask [b].\n\n## Output Requirements\nFormat.\n"
+        steps = DocumentGenerator.get_wizard_steps(content)
+        
+        assert list(DocumentGenerator.iter_wizard_steps(content)) == steps
+        assert list(DocumentGenerator.iter_wizard_steps(content, start=2)) == steps[1:]
+        assert next(DocumentGenerator.iter_wizard_steps(content, start=3))['step_number'] == 3
+    
     def test_validate_document_compliance_valid(self):
         """Test document compliance validation with valid content."""
         from forge.services import DocumentGenerator
@@ -513,8 +1109,65 @@ Just a partial document.
         report = DocumentGenerator.validate_document_compliance(content)
         
         assert report['is_compliant'] is False
-        assert '## Input' in report['missing_sections']
-        assert '## Output Requirements' in report['missing_sections']
+        assert {'## Input', '## Output Requirements'} <= set(report['missing_sections'])
+    
+    def test_validate_document_compliance_sections_case_insensitive(self):
+        """Test required sections are found regardless of heading case."""
+        from forge.services import DocumentGenerator
+        
+        content = "## YOUR ROLE\nRole.\n\n## input\nData.\n\nNo output heading here."
+        report = DocumentGenerator.validate_document_compliance(content)
+        
+        assert report['missing_sections'] == ['## Output Requirements']
+    
+    def test_validate_document_compliance_single_pass_finds_both(self):
+        """Test adjacent headings and placeholders are both detected in the fused scan."""
+        from forge.services import DocumentGenerator
+        
+        content = "## Input[data]## your role {{b}} {{a}} [a]\n## OUTPUT REQUIREMENTS"
+        report = DocumentGenerator.validate_document_compliance(content)
+        
+        assert report['missing_sections'] == []
+        assert report['unreplaced_variables'] == ['a', 'b', 'data']
+    
+    def test_validate_document_compliance_regex_fallback_matches(self, monkeypatch):
+        """Test the report is the same with and without the optional RE2 engine."""
+        from forge.services import DocumentGenerator
+        
+        content = "## YOUR ROLE {{a}}\n## Input [b]\nNo output heading, {{ä}} stays literal."
+        report = DocumentGenerator.validate_document_compliance(content)
+        
+        monkeypatch.setattr(DocumentGenerator, 'COMPLIANCE_DFA', None)
+        
+        assert DocumentGenerator.validate_document_compliance(content) == report
+        assert report['missing_sections'] == ['## Output Requirements']
+        assert report['unreplaced_variables'] == ['a', 'b', 'ä']
+    
+    def test_validate_document_compliance_reports_are_independent(self):
+        """Test compliance reports are not shared between callers."""
+        from forge.services import DocumentGenerator
+        
+        first = DocumentGenerator.validate_document_compliance("Hi {{name}}")
+        first['missing_sections'].clear()
+        first['issues'].append('changed')
+        second = DocumentGenerator.validate_document_compliance("Hi {{name}}")
+        
+        assert len(second['missing_sections']) == 3
+        assert 'changed' not in second['issues']
+        assert second['unreplaced_variables'] == ['name']
+        report = DocumentGenerator._build_compliance_report("Hi {{name}}")
+        assert report.unreplaced_variables == ('name',)
+        assert not hasattr(report, '__dict__')
+    
+    def test_validate_document_compliance_shares_issue_strings(self):
+        """Test missing-section issues are shared between compliance reports."""
+        from forge.services import DocumentGenerator
+        
+        first = DocumentGenerator.validate_document_compliance("First document")
+        second = DocumentGenerator.validate_document_compliance("Second document")
+        
+        assert first['issues'][0] == "Missing required section: ## Your Role"
+        assert first['issues'][0] is second['issues'][0]
     
     def test_validate_document_compliance_unreplaced_variables(self):
         """Test document compliance validation detects unreplaced variables (100% detection)."""
@@ -532,8 +1185,7 @@ Return formatted output.
         report = DocumentGenerator.validate_document_compliance(content)
         
         assert report['is_compliant'] is False
-        assert 'role_name' in report['unreplaced_variables']
-        assert 'input_data' in report['unreplaced_variables']
+        assert {'role_name', 'input_data'} <= set(report['unreplaced_variables'])
 
 
 class TestLoadLocalTemplates:
@@ -564,14 +1216,19 @@ class TestLoadLocalTemplates:
     def test_template_directories_exist(self):
         """Test that all configured template directories exist on disk."""
         import os
+        import stat
         
         base_dir = os.path.join(os.path.dirname(__file__), '..')
         template_dirs = self._get_template_directories()
         
         for template_dir in template_dirs:
             full_path = os.path.join(base_dir, template_dir)
-            assert os.path.exists(full_path), f"Template directory should exist: {full_path}"
-            assert os.path.isdir(full_path), f"Should be a directory: {full_path}"
+            # One stat call answers both existence and type
+            try:
+                mode = os.stat(full_path).st_mode
+            except FileNotFoundError:
+                pytest.fail(f"Template directory should exist: {full_path}")
+            assert stat.S_ISDIR(mode), f"Should be a directory: {full_path}"
     
     def test_template_directories_contain_md_files(self):
         """Test that both template directories contain markdown files."""
@@ -583,6 +1240,168 @@ class TestLoadLocalTemplates:
         
         for template_dir in template_dirs:
             full_path = os.path.join(base_dir, template_dir)
-            md_files = [f for f in os.listdir(full_path) if f.endswith('.md')]
-            assert len(md_files) >= min_count, \
-                f"Directory {template_dir} should have at least {min_count} .md files, found {len(md_files)}"
+            with os.scandir(full_path) as entries:
+                count = sum(1 for entry in entries if entry.name.endswith('.md') and entry.is_file())
+            assert count >= min_count, \
+                f"Directory {template_dir} should have at least {min_count} .md files, found {count}"
+    
+    @pytest.mark.django_db
+    def test_load_templates_from_directory_uses_bulk_queries(self, tmp_path):
+        """Test templates are created and updated with a constant number of queries."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from forge.models import Template
+        from forge.services import GitHubSyncService, TemplateParser
+        
+        self._get_template_directories()
+        from load_local_templates import load_templates_from_directory
+        
+        Template.objects.create(
+            title='Existing Template', content='Old', agent_role='developer', workflow_phase='development'
+        )
+        (tmp_path / 'existing_template.md').write_text('## Your Role\nUpdated {{role}}.', encoding='utf-8')
+        (tmp_path / 'new_template.md').write_text('## Input\nNew [task].', encoding='utf-8')
+        (tmp_path / 'notes.txt').write_text('ignored', encoding='utf-8')
+        
+        with CaptureQueriesContext(connection) as queries:
+            created, updated = load_templates_from_directory(
+                str(tmp_path), TemplateParser(), GitHubSyncService()
+            )
+        
+        assert (created, updated) == (1, 1)
+        assert len(queries) <= 5
+        existing = Template.objects.get(title='Existing Template')
+        assert existing.content == '## Your Role\nUpdated {{role}}.'
+        assert existing.variables == ['role']
+        assert [s['name'] for s in existing.parsed_sections] == ['Your Role']
+        new = Template.objects.get(title='New Template')
+        assert new.variables == ['task']
+        assert new.agent_role in new.agent_roles
+    
+    @pytest.mark.django_db
+    def test_load_templates_from_directory_rerun_keeps_variables(self, tmp_path):
+        """Test re-loading unchanged files stores the same model-derived variables."""
+        from forge.models import Template
+        from forge.services import GitHubSyncService, TemplateParser
+        
+        self._get_template_directories()
+        from load_local_templates import load_templates_from_directory
+        
+        (tmp_path / 'role_template.md').write_text(
+            '## Your Role\n{{ROLE}} and [X], named {{NAME:Ada}}.', encoding='utf-8'
+        )
+        
+        for _ in range(2):
+            load_templates_from_directory(str(tmp_path), TemplateParser(), GitHubSyncService())
+            template = Template.objects.get(title='Role Template')
+            
+            assert template.variables == template.extract_variables() == ['ROLE', 'X']
+    
+    def test_parse_template_files_parallel_matches_serial(self, tmp_path, monkeypatch):
+        """Test parsing in worker processes gives the same results, in order."""
+        from forge.services import GitHubSyncService, TemplateParser
+        
+        self._get_template_directories()
+        import load_local_templates
+        
+        filepaths = []
+        for i in range(3):
+            path = tmp_path / f'template_{i}.md'
+            path.write_text(f'## Your Role\nYou are [role_{i}].', encoding='utf-8')
+            filepaths.append(str(path))
+        filepaths.append(str(tmp_path / 'missing.md'))
+        parser, sync_service = TemplateParser(), GitHubSyncService()
+        
+        serial = load_local_templates.parse_template_files(filepaths, parser, sync_service)
+        monkeypatch.setattr(load_local_templates, 'PARALLEL_PARSE_MIN_FILES', 1)
+        parallel = load_local_templates.parse_template_files(filepaths, parser, sync_service)
+        
+        assert parallel == serial
+        assert [data['variables'] for data in parallel] == [['role_0'], ['role_1'], ['role_2']]
+    
+    def test_list_template_files_only_lists_md_files(self, tmp_path):
+        """Test only regular .md files are listed, and a missing directory lists nothing."""
+        self._get_template_directories()
+        import load_local_templates
+        
+        (tmp_path / 'a.md').write_text('A', encoding='utf-8')
+        (tmp_path / 'notes.txt').write_text('B', encoding='utf-8')
+        (tmp_path / 'folder.md').mkdir()
+        
+        assert load_local_templates.list_template_files(str(tmp_path)) == [str(tmp_path / 'a.md')]
+        assert load_local_templates.list_template_files(str(tmp_path / 'missing')) == []
+    
+    def test_parse_template_files_uses_cache(self, tmp_path):
+        """Test unchanged files are served from the parse cache and changed ones re-parsed."""
+        from unittest.mock import patch
+        from forge.services import GitHubSyncService, TemplateParser
+        
+        self._get_template_directories()
+        import load_local_templates
+        
+        path = tmp_path / 'cached_template.md'
+        path.write_text('## Your Role\nYou are [role].', encoding='utf-8')
+        parser, sync_service = TemplateParser(), GitHubSyncService()
+        cache = {}
+        
+        first = load_local_templates.parse_template_files([str(path)], parser, sync_service, cache)
+        with patch.object(TemplateParser, 'extract_variables_simple', side_effect=AssertionError):
+            second = load_local_templates.parse_template_files([str(path)], parser, sync_service, cache)
+        path.write_text('## Your Role\nYou are [other].', encoding='utf-8')
+        third = load_local_templates.parse_template_files([str(path)], parser, sync_service, cache)
+        
+        assert second == first
+        assert len(cache) == 2
+        assert third[0]['variables'] == ['other']
+
+
+class TestScanKernels:
+    """Tests for the optional Numba scanning kernels."""
+    
+    SAMPLES = [
+        "# Title\nBody {{name}} and [item]\n## Sub  \t\n",
+        "##\nNot a heading\n####### Too deep\n###   \n#\tTabbed\r\n",
+        "{{{x}}} [[y]] {{ z }} [a b] {{_1}}[2]{{}}[]",
+        "",
+    ]
+    
+    @pytest.mark.parametrize("content", SAMPLES)
+    def test_kernels_match_regex_scan(self, content):
+        """Test the kernels (run as plain Python) find what the regexes find."""
+        from forge.services import _scan_numba
+        from forge.services.document_generator import HEADING_PATTERN, VARIABLE_PATTERN
+        
+        buf = content.encode('ascii')
+        heads = [[0] * (len(buf) + 1) for _ in range(5)]
+        count = _scan_numba._heading_kernel(buf, *heads)
+        starts, ends, levels, name_starts, name_ends = heads
+        headings = [
+            (levels[i], content[name_starts[i]:name_ends[i]].strip(), starts[i], ends[i])
+            for i in range(count)
+        ]
+        
+        names = [[0] * (len(buf) + 1) for _ in range(2)]
+        count = _scan_numba._variable_kernel(buf, *names)
+        variables = [content[names[0][i]:names[1][i]] for i in range(count)]
+        
+        assert headings == [
+            (len(m.group(1)), m.group(2).strip(), m.start(), m.end())
+            for m in HEADING_PATTERN.finditer(content)
+        ]
+        assert variables == [m.group(m.lastgroup) for m in VARIABLE_PATTERN.finditer(content)]
+    
+    def test_compiled_scan_matches_regex_scan(self, monkeypatch):
+        """Test large documents scanned by the compiled kernels give the regex results."""
+        pytest.importorskip('numba')
+        from forge.services import document_generator
+        
+        content = "\n".join(self.SAMPLES[:3]) * 50
+        regex_headings = document_generator.scan_headings(content)
+        document_generator._extract_variables_cached.cache_clear()
+        regex_variables = document_generator._extract_variables_cached(content)
+        monkeypatch.setattr(document_generator, 'ACCELERATED_SCAN_MIN_LENGTH', 0)
+        document_generator._extract_variables_cached.cache_clear()
+        
+        assert document_generator.scan_headings(content) == regex_headings
+        assert document_generator._extract_variables_cached(content) == regex_variables
+        assert regex_variables == ('2', '_1', 'item', 'name', 'x', 'y')
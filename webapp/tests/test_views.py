@@ -2,93 +2,175 @@
 Tests for BMAD Forge views.
 """
 
+import re
 import pytest
-from django.urls import reverse
-from django.test import override_settings
+from unittest.mock import patch
+from django.urls import resolve, reverse
+from django.test import Client, override_settings
 from django.core.management import call_command
 from io import StringIO
+from forge import views
 from forge.models import Template, GeneratedPrompt
 
+pytestmark = pytest.mark.django_db
 
-@pytest.mark.django_db
+# Django is configured before test modules are imported, so URLs without
+# arguments are resolved once here rather than in every test
+DASHBOARD_URL = reverse('forge:dashboard')
+TEMPLATE_LIST_URL = reverse('forge:template_list')
+SYNC_URL = reverse('forge:github_sync')
+HISTORY_URL = reverse('forge:prompt_history')
+GENERATE_DOCUMENT_SELECT_URL = reverse('forge:generate_document_select')
+HEALTH_CHECK_URL = reverse('forge:health_check')
+
+# Either-or page checks, each answered by one pass over the response bytes
+VALIDATION_STATUS_PATTERN = re.compile(rb'Invalid|Needs Review')
+SYNC_PAGE_PATTERN = re.compile(rb'GitHub|Sync')
+
+# Read-only pages need no sessions, auth, messages or CSRF checks
+MINIMAL_MIDDLEWARE = ['django.middleware.common.CommonMiddleware']
+
+# Three required BMAD sections, one wizard step each
+WIZARD_TEMPLATE_CONTENT = (
+    '## Your Role\nYou are a developer.\n\n'
+    '## Input\nTask description.\n\n'
+    '## Output Requirements\nFormat specs.'
+)
+
+
+@pytest.fixture(scope='module')
+def module_client():
+    """One test client for the module, so its handler loads middleware once."""
+    return Client()
+
+
+@pytest.fixture
+def shared_client(module_client):
+    """
+    The module's test client with cookies from earlier tests cleared.
+    
+    Tests only talk to the client through requests and its session, so
+    dropping the session and message cookies is all that keeps them isolated.
+    """
+    module_client.cookies.clear()
+    return module_client
+
+
+@pytest.fixture
+def minimal_middleware(settings):
+    """Serve the test's requests through MINIMAL_MIDDLEWARE only."""
+    settings.MIDDLEWARE = MINIMAL_MIDDLEWARE
+    settings.DEBUG = False
+
+
+@pytest.fixture(scope='module')
+def read_only_client():
+    """
+    Test client for classes using minimal_middleware.
+    
+    A client's handler keeps the middleware chain it loads on its first
+    request, so this one is only used under the minimal stack and never
+    shares a handler with shared_client.
+    """
+    return Client()
+
+
+def render_view(view_class, request):
+    """Call a class-based view directly, skipping URL resolution and middleware."""
+    return view_class.as_view()(request).render()
+
+
+def create_templates(*templates):
+    """Insert templates in one bulk INSERT, deriving the fields save() would."""
+    for template in templates:
+        template.refresh_derived_fields()
+    return Template.objects.bulk_create(templates)
+
+
+@pytest.mark.usefixtures('minimal_middleware')
 class TestDashboardView:
     """Tests for the dashboard view."""
     
-    def test_dashboard_view(self, client):
+    def test_dashboard_view(self, rf):
         """Test dashboard loads correctly."""
-        response = client.get(reverse('forge:dashboard'))
+        response = render_view(views.DashboardView, rf.get(DASHBOARD_URL))
         
         assert response.status_code == 200
-        assert 'BMAD Forge' in response.content.decode()
-    
-    def test_dashboard_shows_template_count(self, client):
-        """Test dashboard displays template count."""
-        Template.objects.create(
-            title='Test Template',
-            content='test',
-            agent_role='developer',
-            workflow_phase='development',
-        )
-        
-        response = client.get(reverse('forge:dashboard'))
-        
-        content = response.content.decode()
-        assert '1' in content or 'Total Templates' in content
+        assert b'BMAD Forge' in response.content
 
 
-@pytest.mark.django_db
+@pytest.mark.usefixtures('minimal_middleware')
 class TestTemplateListView:
     """Tests for the template list view."""
     
-    def test_template_list(self, client):
+    def test_template_list(self, rf):
         """Test template list loads."""
-        response = client.get(reverse('forge:template_list'))
+        response = render_view(views.TemplateListView, rf.get(TEMPLATE_LIST_URL))
         
         assert response.status_code == 200
     
-    def test_template_list_with_templates(self, client):
-        """Test template list shows templates."""
+    def test_dashboard_and_list_show_templates(self, read_only_client):
+        """Test the dashboard counts and lists templates, and the template list shows them."""
+        create_templates(
+            Template(
+                title='Developer Template',
+                content='test',
+                agent_role='developer',
+                workflow_phase='development',
+            ),
+            Template(
+                title='Analyst Template',
+                content='test',
+                agent_role='analyst',
+                workflow_phase='planning',
+            ),
+        )
+        
+        dashboard = read_only_client.get(DASHBOARD_URL)
+        template_list = read_only_client.get(TEMPLATE_LIST_URL)
+        
+        assert dashboard.context['total_templates'] == 2
+        for response in (dashboard, template_list):
+            assert b'Developer Template' in response.content
+            assert b'Analyst Template' in response.content
+    
+    def test_template_list_defers_content(self, read_only_client):
+        """Test template list does not load template content."""
         Template.objects.create(
             title='Developer Template',
             content='test',
             agent_role='developer',
             workflow_phase='development',
         )
-        Template.objects.create(
-            title='Analyst Template',
-            content='test',
-            agent_role='analyst',
-            workflow_phase='planning',
-        )
         
-        response = client.get(reverse('forge:template_list'))
-        content = response.content.decode()
+        response = read_only_client.get(TEMPLATE_LIST_URL + '?agent_role=developer')
         
-        assert 'Developer Template' in content
-        assert 'Analyst Template' in content
+        assert 'content' in response.context['templates'][0].get_deferred_fields()
     
-    def test_template_filter_by_role(self, client):
+    def test_template_filter_by_role(self, read_only_client):
         """Test filtering templates by agent role."""
-        Template.objects.create(
-            title='Dev Template',
-            content='test',
-            agent_role='developer',
-            workflow_phase='development',
-        )
-        Template.objects.create(
-            title='Analyst Template',
-            content='test',
-            agent_role='analyst',
-            workflow_phase='planning',
-        )
-        
-        response = client.get(reverse('forge:template_list') + '?agent_role=developer')
-        content = response.content.decode()
-        
-        assert 'Dev Template' in content
-        assert 'Analyst Template' not in content
+        create_templates(
+            Template(
+                title='Dev Template',
+                content='test',
+                agent_role='developer',
+                workflow_phase='development',
+            ),
+            Template(
+                title='Analyst Template',
+                content='test',
+                agent_role='analyst',
+                workflow_phase='planning',
+            ),
+        )
+        
+        response = read_only_client.get(TEMPLATE_LIST_URL + '?agent_role=developer')
+        content = response.content
+        
+        assert b'Dev Template' in content
+        assert b'Analyst Template' not in content
     
-    def test_template_search(self, client):
+    def test_template_search(self, read_only_client):
         """Test searching templates."""
         Template.objects.create(
             title='Authentication Template',
@@ -97,45 +179,47 @@ class TestTemplateListView:
             workflow_phase='development',
         )
         
-        response = client.get(reverse('forge:template_list') + '?search=auth')
-        content = response.content.decode()
+        response = read_only_client.get(TEMPLATE_LIST_URL + '?search=auth')
+        content = response.content
         
-        assert 'Authentication Template' in content
+        assert b'Authentication Template' in content
     
-    def test_template_filter_by_role_with_multi_roles(self, client):
+    def test_template_filter_by_role_with_multi_roles(self, read_only_client):
         """Test filtering templates by role when templates have multiple roles."""
-        # Create a template with multiple roles where 'architect' is secondary
-        Template.objects.create(
-            title='Multi-Role Template',
-            content='test',
-            agent_role='developer',
-            agent_roles=['developer', 'architect'],
-            workflow_phase='development',
-        )
-        # Create a template with only architect role
-        Template.objects.create(
-            title='Architect Only',
-            content='test',
-            agent_role='architect',
-            workflow_phase='planning',
-        )
-        # Create a template with no architect role
-        Template.objects.create(
-            title='QA Only',
-            content='test',
-            agent_role='qa',
-            workflow_phase='development',
+        create_templates(
+            # Create a template with multiple roles where 'architect' is secondary
+            Template(
+                title='Multi-Role Template',
+                content='test',
+                agent_role='developer',
+                agent_roles=['developer', 'architect'],
+                workflow_phase='development',
+            ),
+            # Create a template with only architect role
+            Template(
+                title='Architect Only',
+                content='test',
+                agent_role='architect',
+                workflow_phase='planning',
+            ),
+            # Create a template with no architect role
+            Template(
+                title='QA Only',
+                content='test',
+                agent_role='qa',
+                workflow_phase='development',
+            ),
         )
         
         # Filter by architect - should show both templates with architect role
-        response = client.get(reverse('forge:template_list') + '?agent_role=architect')
-        content = response.content.decode()
+        response = read_only_client.get(TEMPLATE_LIST_URL + '?agent_role=architect')
+        content = response.content
         
-        assert 'Multi-Role Template' in content
-        assert 'Architect Only' in content
-        assert 'QA Only' not in content
+        assert b'Multi-Role Template' in content
+        assert b'Architect Only' in content
+        assert b'QA Only' not in content
     
-    def test_template_filter_multi_role_shows_all_roles_in_display(self, client):
+    def test_template_filter_multi_role_shows_all_roles_in_display(self, read_only_client):
         """Test that templates display all their roles in the template list."""
         Template.objects.create(
             title='Multi-Role Display Test',
@@ -145,96 +229,102 @@ class TestTemplateListView:
             workflow_phase='development',
         )
         
-        response = client.get(reverse('forge:template_list'))
-        content = response.content.decode()
+        response = read_only_client.get(TEMPLATE_LIST_URL)
+        content = response.content
         
         # Check that all roles are displayed
-        assert 'DEVELOPER' in content
-        assert 'ARCHITECT' in content
-        assert 'QA' in content
+        assert b'DEVELOPER' in content
+        assert b'ARCHITECT' in content
+        assert b'QA' in content
     
-    def test_template_filter_by_workflow_phase(self, client):
+    def test_template_filter_by_workflow_phase(self, read_only_client):
         """Test filtering templates by workflow phase."""
-        Template.objects.create(
-            title='Planning Template',
-            content='test',
-            agent_role='pm',
-            workflow_phase='planning',
-        )
-        Template.objects.create(
-            title='Development Template',
-            content='test',
-            agent_role='developer',
-            workflow_phase='development',
+        create_templates(
+            Template(
+                title='Planning Template',
+                content='test',
+                agent_role='pm',
+                workflow_phase='planning',
+            ),
+            Template(
+                title='Development Template',
+                content='test',
+                agent_role='developer',
+                workflow_phase='development',
+            ),
         )
         
         # Filter by planning phase
-        response = client.get(reverse('forge:template_list') + '?workflow_phase=planning')
-        content = response.content.decode()
+        response = read_only_client.get(TEMPLATE_LIST_URL + '?workflow_phase=planning')
+        content = response.content
         
-        assert 'Planning Template' in content
-        assert 'Development Template' not in content
+        assert b'Planning Template' in content
+        assert b'Development Template' not in content
     
-    def test_template_filter_by_workflow_phase_development(self, client):
+    def test_template_filter_by_workflow_phase_development(self, read_only_client):
         """Test filtering templates by development workflow phase."""
-        Template.objects.create(
-            title='Planning Template',
-            content='test',
-            agent_role='pm',
-            workflow_phase='planning',
-        )
-        Template.objects.create(
-            title='Development Template',
-            content='test',
-            agent_role='developer',
-            workflow_phase='development',
+        create_templates(
+            Template(
+                title='Planning Template',
+                content='test',
+                agent_role='pm',
+                workflow_phase='planning',
+            ),
+            Template(
+                title='Development Template',
+                content='test',
+                agent_role='developer',
+                workflow_phase='development',
+            ),
         )
         
         # Filter by development phase
-        response = client.get(reverse('forge:template_list') + '?workflow_phase=development')
-        content = response.content.decode()
+        response = read_only_client.get(TEMPLATE_LIST_URL + '?workflow_phase=development')
+        content = response.content
         
-        assert 'Development Template' in content
-        assert 'Planning Template' not in content
+        assert b'Development Template' in content
+        assert b'Planning Template' not in content
     
-    def test_template_filter_combined_role_and_workflow(self, client):
+    def test_template_filter_combined_role_and_workflow(self, read_only_client):
         """Test filtering templates by both agent role and workflow phase."""
-        # Developer in planning phase
-        Template.objects.create(
-            title='Dev Planning',
-            content='test',
-            agent_role='developer',
-            workflow_phase='planning',
-        )
-        # Developer in development phase
-        Template.objects.create(
-            title='Dev Development',
-            content='test',
-            agent_role='developer',
-            workflow_phase='development',
-        )
-        # PM in planning phase
-        Template.objects.create(
-            title='PM Planning',
-            content='test',
-            agent_role='pm',
-            workflow_phase='planning',
+        create_templates(
+            # Developer in planning phase
+            Template(
+                title='Dev Planning',
+                content='test',
+                agent_role='developer',
+                workflow_phase='planning',
+            ),
+            # Developer in development phase
+            Template(
+                title='Dev Development',
+                content='test',
+                agent_role='developer',
+                workflow_phase='development',
+            ),
+            # PM in planning phase
+            Template(
+                title='PM Planning',
+                content='test',
+                agent_role='pm',
+                workflow_phase='planning',
+            ),
         )
         
         # Filter by developer AND planning
-        response = client.get(reverse('forge:template_list') + '?agent_role=developer&workflow_phase=planning')
-        content = response.content.decode()
+        response = read_only_client.get(TEMPLATE_LIST_URL + '?agent_role=developer&workflow_phase=planning')
+        content = response.content
         
-        assert 'Dev Planning' in content
-        assert 'Dev Development' not in content
-        assert 'PM Planning' not in content
+        assert b'Dev Planning' in content
+        assert b'Dev Development' not in content
+        assert b'PM Planning' not in content
 
 
-@pytest.mark.django_db
+@pytest.mark.usefixtures('minimal_middleware')
 class TestDashboardMultiRoles:
     """Tests for multi-role support in the dashboard."""
     
-    def test_dashboard_counts_templates_by_all_roles(self, client):
+    def test_dashboard_counts_templates_by_all_roles(self, read_only_client):
         """Test that dashboard counts templates for all their roles."""
         # Create a template with multiple roles
         Template.objects.create(
@@ -245,7 +335,7 @@ class TestDashboardMultiRoles:
             workflow_phase='development',
         )
         
-        response = client.get(reverse('forge:dashboard'))
+        response = read_only_client.get(DASHBOARD_URL)
         
         # The template should be counted for both developer and architect
         context = response.context
@@ -254,144 +344,171 @@ class TestDashboardMultiRoles:
         # Both roles should have a count of 1
         assert templates_by_role.get('developer', 0) >= 1
         assert templates_by_role.get('architect', 0) >= 1
+    
+    def test_dashboard_counts_by_phase_and_total(self, read_only_client):
+        """Test dashboard totals and phase counts only include active templates."""
+        create_templates(
+            Template(
+                title='Planning Template',
+                content='test',
+                agent_role='pm',
+                workflow_phase='planning',
+            ),
+            Template(
+                title='Inactive Template',
+                content='test',
+                agent_role='pm',
+                workflow_phase='planning',
+                is_active=False,
+            ),
+        )
+        
+        response = read_only_client.get(DASHBOARD_URL)
+        
+        assert response.context['total_templates'] == 1
+        assert response.context['templates_by_phase'] == {'planning': 1}
+        assert response.context['templates_by_role'] == {'pm': 1}
 
 
-@pytest.mark.django_db
 class TestPromptFormView:
     """Tests for the prompt generation form view."""
     
-    def test_prompt_form_loads(self, client):
+    def test_prompt_form_loads(self, shared_client, dev_template):
         """Test prompt form loads correctly."""
-        template = Template.objects.create(
-            title='Test Template',
-            content='Hello {{name}}!',
-            agent_role='developer',
-            workflow_phase='development',
-        )
-        
-        response = client.get(reverse('forge:prompt_form', args=[template.id]))
+        response = shared_client.get(reverse('forge:prompt_form', args=[dev_template.id]))
         
         assert response.status_code == 200
     
-    def test_prompt_form_generates_prompt(self, client):
+    def test_prompt_form_generates_prompt(self, shared_client, dev_template):
         """Test form submission generates a prompt."""
-        template = Template.objects.create(
-            title='Test Template',
-            content='Hello {{name}}!',
-            agent_role='developer',
-            workflow_phase='development',
-        )
-        
-        response = client.post(
-            reverse('forge:prompt_form', args=[template.id]),
+        response = shared_client.post(
+            reverse('forge:prompt_form', args=[dev_template.id]),
             {'name': 'World'}
         )
         
         assert response.status_code == 302
-        assert GeneratedPrompt.objects.filter(template=template).exists()
+        # The redirect carries the new prompt's id, so no extra query is needed
+        assert resolve(response.url).url_name == 'prompt_result'
+    
+    def test_prompt_result_reuses_stored_validation_report(self, shared_client, dev_template):
+        """Test the result page uses the report saved at generation time."""
+        shared_client.post(reverse('forge:prompt_form', args=[dev_template.id]), {'name': 'World'})
+        prompt = GeneratedPrompt.objects.get(template=dev_template)
+        
+        assert prompt.validation_report['is_valid'] is False
+        
+        with patch('forge.views.BMADValidator.validate') as validate:
+            response = shared_client.get(reverse('forge:prompt_result', args=[prompt.id]))
+        
+        validate.assert_not_called()
+        assert response.context['validation_details'] == prompt.validation_report
+
+
+@pytest.fixture
+def result_prompt(request, dev_template):
+    """Generated prompt for dev_template, built from the test's indirect parameters."""
+    return GeneratedPrompt.objects.create(template=dev_template, **request.param)
 
 
-@pytest.mark.django_db
 class TestPromptResultView:
     """Tests for the prompt result view."""
     
-    def test_prompt_result_view(self, client):
-        """Test viewing a generated prompt."""
-        template = Template.objects.create(
-            title='Test',
-            content='Hello {{name}}!',
-            agent_role='developer',
-            workflow_phase='development',
-        )
-        prompt = GeneratedPrompt.objects.create(
-            template=template,
-            input_data={'name': 'World'},
-            final_output='Hello World!',
-            is_valid=True,
-        )
-        
-        response = client.get(reverse('forge:prompt_result', args=[prompt.id]))
+    @pytest.mark.parametrize("result_prompt,pattern", [
+        # The generated output is shown
+        ({'input_data': {'name': 'World'}, 'final_output': 'Hello World!', 'is_valid': True},
+         re.compile(rb'Hello World!')),
+        # The validation status is shown
+        ({'input_data': {}, 'final_output': 'test', 'is_valid': False, 'validation_notes': ['Missing section']},
+         VALIDATION_STATUS_PATTERN),
+    ], indirect=['result_prompt'], ids=['output', 'validation'])
+    def test_prompt_result_view(self, shared_client, result_prompt, pattern):
+        """Test viewing a generated prompt shows its output and validation status."""
+        response = shared_client.get(reverse('forge:prompt_result', args=[result_prompt.id]))
         
         assert response.status_code == 200
-        assert 'Hello World!' in response.content.decode()
+        assert pattern.search(response.content)
     
-    def test_prompt_result_shows_validation(self, client):
-        """Test validation status is displayed."""
-        template = Template.objects.create(
-            title='Test',
-            content='test',
-            agent_role='developer',
-            workflow_phase='development',
-        )
+    def test_download_prompt_streams_markdown(self, shared_client, dev_template):
+        """Test downloading a prompt streams the full output as an attachment."""
+        final_output = 'Héllo World! ' * 10000
         prompt = GeneratedPrompt.objects.create(
-            template=template,
+            template=dev_template,
             input_data={},
-            final_output='test',
-            is_valid=False,
-            validation_notes=['Missing section'],
+            final_output=final_output,
+            is_valid=True,
         )
         
-        response = client.get(reverse('forge:prompt_result', args=[prompt.id]))
-        content = response.content.decode()
+        response = shared_client.get(reverse('forge:download_prompt', args=[prompt.id]))
         
-        assert 'Invalid' in content or 'Needs Review' in content
+        assert response.status_code == 200
+        assert response.streaming
+        assert 'attachment' in response['Content-Disposition']
+        assert b''.join(response.streaming_content).decode('utf-8') == final_output
 
 
-@pytest.mark.django_db
 class TestGitHubSyncView:
     """Tests for the GitHub sync view."""
     
-    def test_sync_view_loads(self, client):
+    def test_sync_view_loads(self, rf):
         """Test sync view loads."""
-        response = client.get(reverse('forge:github_sync'))
+        response = render_view(views.GitHubSyncView, rf.get(SYNC_URL))
         
         assert response.status_code == 200
-        assert 'GitHub' in response.content.decode() or 'Sync' in response.content.decode()
+        assert SYNC_PAGE_PATTERN.search(response.content)
 
 
-@pytest.mark.django_db
+@pytest.mark.usefixtures('minimal_middleware')
 class TestPromptHistoryView:
     """Tests for the prompt history view."""
     
-    def test_history_view_loads(self, client):
+    def test_history_view_loads(self, rf):
         """Test history view loads."""
-        response = client.get(reverse('forge:prompt_history'))
+        response = render_view(views.PromptHistoryView, rf.get(HISTORY_URL))
         
         assert response.status_code == 200
     
-    def test_history_shows_prompts(self, client):
+    def test_history_shows_prompts(self, read_only_client, dev_template):
         """Test history displays generated prompts."""
-        template = Template.objects.create(
-            title='Test',
-            content='test',
-            agent_role='developer',
-            workflow_phase='development',
+        GeneratedPrompt.objects.create(
+            template=dev_template,
+            input_data={},
+            final_output='test',
+            is_valid=True,
         )
+        
+        response = read_only_client.get(HISTORY_URL)
+        content = response.content
+        
+        assert b'Test' in content
+    
+    def test_history_defers_prompt_output(self, read_only_client, dev_template):
+        """Test history listing does not load generated prompt bodies."""
         GeneratedPrompt.objects.create(
-            template=template,
+            template=dev_template,
             input_data={},
             final_output='test',
             is_valid=True,
         )
         
-        response = client.get(reverse('forge:prompt_history'))
-        content = response.content.decode()
+        response = read_only_client.get(HISTORY_URL)
+        prompt = response.context['prompts'][0]
         
-        assert 'Test' in content
+        assert 'final_output' in prompt.get_deferred_fields()
+        assert response.context['paginator'].count == 1
 
 
-@pytest.mark.django_db
+@pytest.mark.usefixtures('minimal_middleware')
 class TestGenerateDocumentSelectView:
     """Tests for the document generation selection view."""
     
-    def test_generate_document_select_loads(self, client):
+    def test_generate_document_select_loads(self, rf):
         """Test generate document selection page loads."""
-        response = client.get(reverse('forge:generate_document_select'))
+        response = render_view(views.GenerateDocumentSelectView, rf.get(GENERATE_DOCUMENT_SELECT_URL))
         
         assert response.status_code == 200
-        assert 'Generate Document' in response.content.decode()
+        assert b'Generate Document' in response.content
     
-    def test_generate_document_select_shows_templates(self, client):
+    def test_generate_document_select_shows_templates(self, read_only_client):
         """Test that templates are displayed for selection."""
         Template.objects.create(
             title='Test Template',
@@ -400,96 +517,88 @@ class TestGenerateDocumentSelectView:
             workflow_phase='development',
         )
         
-        response = client.get(reverse('forge:generate_document_select'))
-        content = response.content.decode()
+        response = read_only_client.get(GENERATE_DOCUMENT_SELECT_URL)
+        content = response.content
         
-        assert 'Test Template' in content
+        assert b'Test Template' in content
 
 
-@pytest.mark.django_db
-class TestGenerateDocumentWizardView:
-    """Tests for the document generation wizard view."""
-    
-    def test_wizard_view_loads(self, client):
-        """Test wizard view loads for a template."""
-        template = Template.objects.create(
+@pytest.fixture(scope='class')
+def wizard_template(class_db, django_db_blocker):
+    """Three-section BMAD template created once per test class."""
+    with django_db_blocker.unblock():
+        return Template.objects.create(
             title='Wizard Template',
-            content='## Your Role\nYou are a developer.\n\n## Input\nTask description.\n\n## Output Requirements\nFormat specs.',
+            content=WIZARD_TEMPLATE_CONTENT,
             agent_role='developer',
             workflow_phase='development',
         )
-        
-        response = client.get(reverse('forge:generate_document_wizard', args=[template.id]))
-        
-        assert response.status_code == 200
-        assert 'Wizard Template' in response.content.decode()
-    
-    def test_wizard_shows_steps(self, client):
-        """Test wizard displays section steps."""
-        template = Template.objects.create(
-            title='Multi-Section Template',
-            content='## Section One\nContent one.\n\n## Section Two\nContent two.',
-            agent_role='developer',
-            workflow_phase='development',
-        )
-        
-        response = client.get(reverse('forge:generate_document_wizard', args=[template.id]))
-        content = response.content.decode()
-        
-        assert 'Section One' in content or 'Step' in content
+
+
+@pytest.fixture
+def wizard_session(settings, shared_client, wizard_template):
+    """Session holding earlier steps' answers, as left by navigating through them."""
+    session = shared_client.session
+    session[f'doc_gen_{wizard_template.id}'] = {
+        'Your Role': 'Test role content',
+        'Input': 'Test input content',
+        'Output Requirements': 'Test output content',
+    }
+    session.save()
+    # A cookie-backed session's key is its data, so hand the client the new cookie
+    shared_client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+    return session
+
+
+class TestGenerateDocumentWizardView:
+    """Tests for the document generation wizard view."""
     
-    def test_wizard_navigation_next(self, client):
-        """Test navigating to next step in wizard."""
-        template = Template.objects.create(
-            title='Nav Template',
-            content='## Section One\nContent one.\n\n## Section Two\nContent two.',
-            agent_role='developer',
-            workflow_phase='development',
-        )
-        
-        response = client.post(
-            reverse('forge:generate_document_wizard', args=[template.id]),
-            {'current_step': 1, 'action': 'next', 'section_content': 'Test content'}
-        )
-        
-        assert response.status_code == 302
-        assert '?step=2' in response.url
+    @pytest.mark.parametrize("method,query,payload,check", [
+        # The wizard loads for a template
+        ('get', '', None, lambda r: r.status_code == 200 and b'Wizard Template' in r.content),
+        # The wizard displays its section steps
+        ('get', '', None, lambda r: b'Your Role' in r.content),
+        # Next moves on to the following step
+        ('post', '', {'current_step': 1, 'action': 'next', 'section_content': 'Test content'},
+         lambda r: r.status_code == 302 and '?step=2' in r.url),
+        # Generate on the final step saves the document and redirects to it
+        ('post', '?step=3', {'current_step': 3, 'action': 'generate', 'section_content': 'Final content'},
+         lambda r: r.status_code == 302 and resolve(r.url).url_name == 'prompt_result'),
+    ], ids=['loads', 'shows_steps', 'navigation_next', 'generates_document'])
+    def test_wizard(self, request, shared_client, wizard_template, method, query, payload, check):
+        """Test wizard pages and step actions against one shared template."""
+        url = reverse('forge:generate_document_wizard', args=[wizard_template.id]) + query
+        
+        if method == 'get':
+            response = shared_client.get(url)
+        else:
+            # Only the step actions read earlier answers, so GETs skip the session write
+            request.getfixturevalue('wizard_session')
+            response = shared_client.post(url, payload)
+        
+        assert check(response)
+
+
+class TestTemplateLoading:
+    """Tests for how view templates are loaded during the test run."""
     
-    def test_wizard_generates_document(self, client):
-        """Test wizard generates document on final step."""
-        template = Template.objects.create(
-            title='Generate Template',
-            content='## Your Role\nYou are a developer.\n\n## Input\nTask description.\n\n## Output Requirements\nFormat specs.',
-            agent_role='developer',
-            workflow_phase='development',
-        )
+    def test_templates_use_cached_loader(self):
+        """Test view templates are compiled once and reused across requests."""
+        from django.template import engines
+        from django.template.loaders.cached import Loader
         
-        # First, set up session data by navigating through steps
-        session = client.session
-        session[f'doc_gen_{template.id}'] = {
-            'Your Role': 'Test role content',
-            'Input': 'Test input content',
-            'Output Requirements': 'Test output content',
-        }
-        session.save()
-        
-        response = client.post(
-            reverse('forge:generate_document_wizard', args=[template.id]) + '?step=3',
-            {'current_step': 3, 'action': 'generate', 'section_content': 'Final content'}
-        )
+        engine = engines['django'].engine
         
-        # Should redirect to prompt result
-        assert response.status_code == 302
-        assert GeneratedPrompt.objects.filter(template=template).exists()
+        assert isinstance(engine.template_loaders[0], Loader)
+        assert engine.get_template('forge/dashboard.html') is engine.get_template('forge/dashboard.html')
 
 
-@pytest.mark.django_db
 class TestHealthCheckView:
     """Tests for the HTTP health check endpoint."""
 
-    def test_health_check_endpoint_healthy(self, client):
+    def test_health_check_endpoint_healthy(self, shared_client):
         """Health check returns 200 when all systems operational."""
-        response = client.get(reverse('forge:health_check'))
+        response = shared_client.get(HEALTH_CHECK_URL)
 
         assert response.status_code == 200
         data = response.json()
@@ -498,9 +607,9 @@ class TestHealthCheckView:
         assert 'database' in data['checks']
         assert 'cache' in data['checks']
 
-    def test_health_check_includes_app_info(self, client):
+    def test_health_check_includes_app_info(self, shared_client):
         """Health check includes application name and version."""
-        response = client.get(reverse('forge:health_check'))
+        response = shared_client.get(HEALTH_CHECK_URL)
 
         data = response.json()
         assert 'app' in data
@@ -514,9 +623,9 @@ class TestHealthCheckView:
             }
         }
     )
-    def test_health_check_with_dummy_cache_in_debug(self, client):
+    def test_health_check_with_dummy_cache_in_debug(self, shared_client):
         """Health check handles DummyCache gracefully in DEBUG mode."""
-        response = client.get(reverse('forge:health_check'))
+        response = shared_client.get(HEALTH_CHECK_URL)
 
         assert response.status_code == 200
         data = response.json()
@@ -525,7 +634,6 @@ class TestHealthCheckView:
         assert 'ok' in data['checks']['cache'].lower()
 
 
-@pytest.mark.django_db
 class TestHealthCheckManagementCommand:
     """Tests for the health_check management command."""
 